@@ -1,10 +1,23 @@
 import streamlit as st
+from streamlit.errors import StreamlitAPIException
 from datetime import datetime, time
+import atexit
+import logging
+from itertools import islice
+import os
+import threading
 import uuid
-from typing import Optional
+import weakref
+from time import monotonic
+import pandas as pd
+from typing import TYPE_CHECKING, Optional
 
-# Core PawPal system classes
-from pawpal_system import User, Pet, Task, TaskScheduler, UserDataManager
+# Core PawPal data classes; TaskScheduler / UserDataManager are imported lazily
+# inside the cached factories below.
+from pawpal_system import User, Pet, Task, format_hhmm
+
+if TYPE_CHECKING:
+    from pawpal_system import TaskScheduler, UserDataManager
 
 st.set_page_config(
     page_title="PawPal+",
@@ -14,50 +27,336 @@ st.set_page_config(
 )
 
 # -----------------------
-# Session init
+# Cached resources
 # -----------------------
-if "pawpal_user" not in st.session_state:
-    # Try to load a previously-saved user; otherwise create a default.
-    udm_init = UserDataManager()
-    loaded = None
+@st.cache_resource
+def get_udm() -> "UserDataManager":
+    from pawpal_system import UserDataManager
+    return UserDataManager()
+
+# TaskScheduler only holds a reference to the live User and reads its tasks on each
+# schedule_tasks call, so task edits don't need a new one. max_entries bounds the
+# schedulers (and the Users they keep alive) left behind by reloaded users.
+@st.cache_resource(max_entries=64)
+def get_scheduler(_user: User, username: str, user_key: int) -> "TaskScheduler":
+    # `_user` is excluded from hashing. Sessions for a username share one cached User
+    # (see _load_or_create_user), so user_key (its id) only changes when that User is
+    # reloaded; the new object then gets its own scheduler instead of the stale one.
+    from pawpal_system import TaskScheduler
+    return TaskScheduler(_user)
+
+PERSIST_INTERVAL_S = 5.0
+
+logger = logging.getLogger(__name__)
+
+class _PersistQueue:
+    """Coalesces user/schedule writes so bursts of edits hit disk at most once per interval.
+
+    The first write after an idle window goes out immediately; later ones inside the
+    window are held and flushed by a daemon timer (or at interpreter exit).
+    """
+
+    def __init__(self, udm: "UserDataManager"):
+        self.udm = udm
+        self.user: Optional[User] = None
+        self.schedule = None
+        self.last_flush = 0.0
+        self.timer: Optional[threading.Timer] = None
+        self.lock = threading.Lock()
+
+    def submit(self, user: Optional[User] = None, schedule=None) -> None:
+        with self.lock:
+            if user is not None:
+                self.user = user
+            if schedule is not None:
+                self.schedule = schedule
+            due = monotonic() - self.last_flush >= PERSIST_INTERVAL_S
+            if not due and self.timer is None:
+                self.timer = threading.Timer(PERSIST_INTERVAL_S, self.flush)
+                self.timer.daemon = True
+                self.timer.start()
+        if due:
+            self.flush()
+
+    def flush(self) -> None:
+        with self.lock:
+            user, schedule = self.user, self.schedule
+            self.user = self.schedule = None
+            self.last_flush = monotonic()
+            if self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+        if user is not None:
+            try:
+                self.udm.save_user(user)
+            except Exception:
+                logger.exception("Saving user %r failed", user.username)
+        if schedule is not None:
+            try:
+                self.udm.save_schedule(schedule)
+            except Exception:
+                logger.exception("Saving schedule for %r failed", schedule.user_id)
+
+@st.cache_resource
+def _persist_queues() -> "weakref.WeakSet[_PersistQueue]":
+    queues = weakref.WeakSet()
+    atexit.register(lambda: [q.flush() for q in list(queues)])
+    return queues
+
+@st.cache_resource
+def _load_or_create_user(username: str) -> User:
+    """Load a previously-saved user, or create a default one.
+
+    Cached as a resource, so every session for the same username shares one
+    in-memory User and only the first session reads the JSON file.
+    """
     try:
-        loaded = udm_init.load_user("Jordan")
+        loaded = get_udm().load_user(username)
     except Exception:
         loaded = None
+    return loaded if loaded else User(username=username, password="")
+
+def _schedule_fingerprint(u: User, date_key) -> tuple:
+    return (
+        tuple(u.availability),
+        date_key,
+        tuple(
+            (p.pet_id, t.task_id, t.duration, t.priority, t.is_medication, t.preferred_time,
+             t.is_recurring, t.recurrence_pattern, tuple(t.recurrence_days))
+            for p in u.pets for t in p.tasks
+        ),
+    )
+
+def compute_schedule(u: User, scheduler: "TaskScheduler"):
+    """Return the memoized schedule when nothing that affects it has changed.
+
+    Kept in session_state rather than st.cache_data: cache_data returns a
+    pickled copy, which would detach ScheduledTask.task from the user's Task
+    objects and lose next_due_date updates on completion.
+    """
+    now = datetime.now()
+    key = _schedule_fingerprint(u, now.date())
+    memo = st.session_state.get("schedule_memo")
+    if memo is not None and memo[0] == key:
+        return memo[1]
+    schedule = scheduler.schedule_tasks(now)
+    st.session_state["schedule_memo"] = (key, schedule)
+    return schedule
+
+# -----------------------
+# Session init
+# -----------------------
+if "pawpal_user" not in st.session_state:
+    st.session_state["pawpal_user"] = _load_or_create_user("Jordan")
+
+ARCHIVE_PAGE_SIZE = 20
+ARCHIVE_TASK_FIELDS = ("task_id", "pet_id", "duration", "priority", "category", "is_medication", "preferred_time")
 
-    st.session_state["pawpal_user"] = loaded if loaded else User(username="Jordan", password="")
+def _upgrade_archive_entry(a: dict) -> dict:
+    # Older sessions stored flat entries with "task_name" instead of Task kwargs.
+    if "task" in a:
+        return a
+    task = {k: a[k] for k in ARCHIVE_TASK_FIELDS if k in a}
+    task["name"] = a.get("task_name")
+    return {"task": task, "pet_name": a.get("pet_name"), "completed_at": a.get("completed_at", "")}
 
+# task_id -> {"task": Task kwargs, "pet_name": ..., "completed_at": ...}
 if "archived_tasks" not in st.session_state:
-    st.session_state["archived_tasks"] = []
+    st.session_state["archived_tasks"] = {}
+elif isinstance(st.session_state["archived_tasks"], list):
+    st.session_state["archived_tasks"] = {
+        a["task_id"]: _upgrade_archive_entry(a) for a in st.session_state["archived_tasks"]
+    }
 
 if "last_schedule" not in st.session_state:
     st.session_state["last_schedule"] = None
 
+if "user_dirty" not in st.session_state:
+    st.session_state["user_dirty"] = False
+
+if "persist_queue" not in st.session_state:
+    st.session_state["persist_queue"] = _PersistQueue(get_udm())
+    _persist_queues().add(st.session_state["persist_queue"])
+
+if "id_pool" not in st.session_state:
+    st.session_state["id_pool"] = []
+
 user: User = st.session_state["pawpal_user"]
 
+# The indexes below are rebuilt from the User on every full rerun: the User is shared
+# by all sessions for this username, so another session may have added pets since
+# this one last ran. Pets are only added from the sidebar, which always triggers
+# a full rerun, so fragment reruns can rely on them too.
+
+# name -> Pet; first pet wins on duplicate names, matching the old scan.
+pet_by_name = {}
+for p in user.pets:
+    pet_by_name.setdefault(p.name, p)
+
+pets_by_id = {p.pet_id: p for p in user.pets}
+
+# Shared by the Add Task pet picker and the schedule pet filter.
+pet_names = list(pet_by_name)
+
 # -----------------------
 # Helpers
 # -----------------------
 def _pet_by_name(pet_name: str) -> Optional[Pet]:
-    return next((p for p in user.pets if p.name == pet_name), None)
+    return pet_by_name.get(pet_name)
+
+def _pet_by_id(pet_id: str) -> Optional[Pet]:
+    return pets_by_id.get(pet_id)
 
-def _pet_name_by_id(pet_id: str) -> str:
-    return next((p.name for p in user.pets if p.pet_id == pet_id), pet_id)
+# Indexed by priority (clamped to 0-6): <3 Low, 3 Medium, >=4 High.
+PRIORITY_LABEL = ["🟢 Low"] * 3 + ["🟡 Medium"] + ["🔴 High"] * 3
 
 def _priority_label(priority: int) -> str:
-    return "🔴 High" if priority >= 4 else "🟡 Medium" if priority >= 3 else "🟢 Low"
+    return PRIORITY_LABEL[min(max(priority, 0), 6)]
+
+SCHEDULE_COLUMNS = ["Time", "Task", "Pet", "Priority", "Duration", "Status"]
+
+def _schedule_view_fingerprint(schedule) -> tuple:
+    """Everything the schedule table shows, as plain hashable values in scheduled_tasks order."""
+    return tuple(
+        (
+            t.pet_id,
+            t.status,
+            t.start_time,
+            t.end_time,
+            t.task.name if t.task else t.task_id,
+            t.task.priority if t.task else 0,
+            t.task.duration if t.task else "",
+        )
+        for t in schedule.scheduled_tasks
+    )
+
+# Every filter combination is its own entry; bound them, and let rows for schedules
+# no longer on screen expire.
+@st.cache_data(max_entries=256, ttl=3600)
+def _build_schedule_rows(fingerprint: tuple, pet_names: tuple, pet_filter: str, status_filter: str,
+                         time_from: time, time_to: time) -> list:
+    """Filtered, time-sorted rows: (index into scheduled_tasks, time, task, pet, priority, duration, status)."""
+    names = dict(pet_names)
+    rows = []
+    for idx in sorted(range(len(fingerprint)), key=lambda i: fingerprint[i][2]):
+        pet_id, status, start, end, task_name, priority, duration = fingerprint[idx]
+        pet_name = names.get(pet_id, pet_id)
+        if pet_filter != "All" and pet_name != pet_filter:
+            continue
+        if status_filter != "All" and status != status_filter:
+            continue
+        if start is not None and not (time_from <= start <= time_to):
+            continue
+        rows.append((
+            idx,
+            f"{format_hhmm(start)} - {format_hhmm(end)}",
+            task_name,
+            pet_name,
+            _priority_label(priority),
+            f"{duration} min",
+            status,
+        ))
+    return rows
+
+ID_POOL_SIZE = 64
+
+def _next_id() -> str:
+    """Pop a uuid4 hex id from the session pool, refilling it from one urandom read."""
+    pool = st.session_state["id_pool"]
+    if not pool:
+        buf = os.urandom(16 * ID_POOL_SIZE)
+        pool.extend(
+            uuid.UUID(bytes=buf[i:i + 16], version=4).hex for i in range(0, len(buf), 16)
+        )
+    return pool.pop()
+
+def _mark_user_dirty() -> None:
+    st.session_state["user_dirty"] = True
+
+def _schedule_hash(schedule) -> int:
+    return hash(tuple((s.task_id, s.start_time, s.status) for s in schedule.scheduled_tasks))
 
 def _persist_user_and_schedule(schedule=None) -> None:
-    udm = UserDataManager()
-    try:
-        udm.save_user(user)
-    except Exception:
-        pass
+    """Queue the user (when dirty) and the schedule (when its content changed) for writing."""
+    queue: _PersistQueue = st.session_state["persist_queue"]
+    if st.session_state["user_dirty"]:
+        queue.submit(user=user)
+        st.session_state["user_dirty"] = False
     if schedule is not None:
-        try:
-            udm.save_schedule(schedule)
-        except Exception:
-            pass
+        h = _schedule_hash(schedule)
+        if h != st.session_state.get("last_schedule_hash"):
+            queue.submit(schedule=schedule)
+            st.session_state["last_schedule_hash"] = h
+
+OVERVIEW_COLUMNS = ["task_id", "Task", "Duration (min)", "Priority", "Category", "Medication", "Recurring", "Preferred"]
+
+# One entry per pet per edit of its tasks; older versions are never read again.
+@st.cache_data(max_entries=128, ttl=3600)
+def _pet_task_table(pet_id: str, fingerprint: tuple) -> pd.DataFrame:
+    """Task overview table for one pet, rebuilt only when that pet's tasks change."""
+    df = pd.DataFrame(fingerprint, columns=OVERVIEW_COLUMNS)
+    df["Priority"] = df["Priority"].clip(0, 6).map(lambda i: PRIORITY_LABEL[i])
+    df["Medication"] = df["Medication"].map({True: "✓", False: "✗"})
+    df["Recurring"] = df["Recurring"].map({True: "✓", False: "✗"})
+    return df.drop(columns="task_id")
+
+def _set_task_completed(schedule, st_task, completed: bool, now: datetime) -> None:
+    """Apply a completion toggle from the schedule table and persist it."""
+    if not completed:
+        st_task.status = "pending"
+        _persist_user_and_schedule(schedule)
+        return
+
+    task_obj = st_task.task
+    task_name = task_obj.name if task_obj else st_task.task_id
+    try:
+        pet_obj = _pet_by_id(st_task.pet_id)
+
+        # If non-recurring, archive + remove from active pet tasks
+        if task_obj and not task_obj.is_recurring and pet_obj:
+            pet_obj.tasks = [t for t in pet_obj.tasks if t.task_id != task_obj.task_id]
+            st.session_state["archived_tasks"][task_obj.task_id] = {
+                "task": {
+                    "task_id": task_obj.task_id,
+                    "pet_id": pet_obj.pet_id,
+                    "name": task_obj.name,
+                    "duration": task_obj.duration,
+                    "priority": task_obj.priority,
+                    "category": task_obj.category,
+                    "is_medication": task_obj.is_medication,
+                    "preferred_time": task_obj.preferred_time,
+                },
+                "pet_name": pet_obj.name,
+                "completed_at": now.isoformat(),
+            }
+            st_task.status = "completed"
+        else:
+            try:
+                st_task.mark_complete(now)
+            except Exception:
+                st_task.status = "completed"
+
+        _mark_user_dirty()
+        _persist_user_and_schedule(schedule)
+        # Toast survives the st.rerun() that refreshes the table afterwards.
+        st.toast(f"Marked '{task_name}' completed.", icon="✅")
+    except Exception as e:
+        st.error(f"An error occurred: {e}")
+
+@st.cache_data(max_entries=64)
+def _compute_unscheduled(pets_fingerprint: tuple, schedule_fingerprint: tuple) -> list:
+    """Rows for active tasks missing from the schedule; both inputs are plain-value fingerprints."""
+    scheduled_ids = frozenset(schedule_fingerprint)
+    return [
+        {
+            "Task": name,
+            "Pet": pet_name,
+            "Duration (min)": duration,
+            "Priority": _priority_label(priority),
+        }
+        for pet_name, task_id, name, duration, priority in pets_fingerprint
+        if task_id not in scheduled_ids
+    ]
 
 # -----------------------
 # Sidebar UI
@@ -70,16 +369,18 @@ with st.sidebar.expander("👤 User", expanded=True):
     st.sidebar.caption("Tip: Add pets/tasks below, then generate a schedule.")
 
 with st.sidebar.expander("➕ Add Pet", expanded=False):
-    new_pet_name = st.text_input("Pet name", key="sb_pet_name")
-    new_species = st.selectbox("Species", ["dog", "cat", "other"], key="sb_pet_species")
-    new_age = st.number_input("Age", min_value=0, max_value=50, value=2, key="sb_pet_age")
-    new_health = st.text_input("Health info", value="Healthy", key="sb_pet_health")
-
-    if st.button("Add Pet", key="sb_add_pet"):
+    with st.form("add_pet_form", clear_on_submit=True):
+        new_pet_name = st.text_input("Pet name", key="sb_pet_name")
+        new_species = st.selectbox("Species", ["dog", "cat", "other"], key="sb_pet_species")
+        new_age = st.number_input("Age", min_value=0, max_value=50, value=2, key="sb_pet_age")
+        new_health = st.text_input("Health info", value="Healthy", key="sb_pet_health")
+        add_pet_submitted = st.form_submit_button("Add Pet")
+
+    if add_pet_submitted:
         if not new_pet_name.strip():
             st.warning("Please enter a pet name.")
         else:
-            pet_id = f"{user.username}-{new_pet_name}-{uuid.uuid4().hex[:6]}"
+            pet_id = f"{user.username}-{new_pet_name}-{_next_id()[:6]}"
             pet = Pet(
                 pet_id=pet_id,
                 name=new_pet_name.strip(),
@@ -88,6 +389,10 @@ with st.sidebar.expander("➕ Add Pet", expanded=False):
                 health_info=new_health.strip(),
             )
             user.pets.append(pet)
+            pets_by_id[pet.pet_id] = pet
+            if pet_by_name.setdefault(pet.name, pet) is pet:
+                pet_names.append(pet.name)
+            _mark_user_dirty()
             _persist_user_and_schedule()
             st.success(f"Added pet: {pet.name}")
 
@@ -95,33 +400,35 @@ with st.sidebar.expander("📝 Add Task", expanded=False):
     if not user.pets:
         st.info("Add a pet first.")
     else:
-        pet_names = [p.name for p in user.pets]
-        add_selected_pet = st.selectbox("Select pet", options=pet_names, key="sb_task_pet")
-        add_title = st.text_input("Task title", value="Morning walk", key="sb_task_title")
-        add_duration = st.number_input(
-            "Duration (minutes)", min_value=1, max_value=240, value=20, key="sb_task_duration"
-        )
-        add_priority_str = st.selectbox("Priority", ["low", "medium", "high"], index=2, key="sb_task_priority")
-        add_category = st.selectbox(
-            "Category",
-            ["general", "walk", "feeding", "grooming", "play", "medication"],
-            index=0,
-            key="sb_task_category",
-        )
-        add_is_med = st.checkbox("Is medication", value=(add_category == "medication"), key="sb_task_med")
-        add_pref_time = st.selectbox("Preferred time", ["flexible", "morning", "evening"], index=0, key="sb_task_pref")
-        add_recurring = st.checkbox("Recurring", value=False, key="sb_task_recurring")
-        add_recur_pattern = st.selectbox(
-            "Recurrence pattern",
-            ["daily", "every_other_day", "weekly"],
-            index=0,
-            key="sb_task_recur_pattern",
-            disabled=not add_recurring,
-        )
+        with st.form("add_task_form", clear_on_submit=True):
+            add_selected_pet = st.selectbox("Select pet", options=pet_names, key="sb_task_pet")
+            add_title = st.text_input("Task title", value="Morning walk", key="sb_task_title")
+            add_duration = st.number_input(
+                "Duration (minutes)", min_value=1, max_value=240, value=20, key="sb_task_duration"
+            )
+            add_priority_str = st.selectbox("Priority", ["low", "medium", "high"], index=2, key="sb_task_priority")
+            add_category = st.selectbox(
+                "Category",
+                ["general", "walk", "feeding", "grooming", "play", "medication"],
+                index=0,
+                key="sb_task_category",
+            )
+            # Widgets inside a form only report on submit, so "medication" category
+            # implies the flag instead of pre-ticking the checkbox.
+            add_is_med = st.checkbox("Is medication", value=False, key="sb_task_med")
+            add_pref_time = st.selectbox("Preferred time", ["flexible", "morning", "evening"], index=0, key="sb_task_pref")
+            add_recurring = st.checkbox("Recurring", value=False, key="sb_task_recurring")
+            add_recur_pattern = st.selectbox(
+                "Recurrence pattern (if recurring)",
+                ["daily", "every_other_day", "weekly"],
+                index=0,
+                key="sb_task_recur_pattern",
+            )
+            add_task_submitted = st.form_submit_button("Add Task")
 
         priority_map = {"low": 2, "medium": 3, "high": 5}
 
-        if st.button("Add Task", key="sb_add_task"):
+        if add_task_submitted:
             pet_obj = _pet_by_name(add_selected_pet)
             if not pet_obj:
                 st.error("Pet not found. Try again.")
@@ -129,18 +436,19 @@ with st.sidebar.expander("📝 Add Task", expanded=False):
                 st.warning("Please enter a task title.")
             else:
                 task = Task(
-                    task_id=uuid.uuid4().hex,
+                    task_id=_next_id(),
                     pet_id=pet_obj.pet_id,
                     name=add_title.strip(),
                     duration=int(add_duration),
                     priority=priority_map.get(add_priority_str, 3),
                     category=add_category,
-                    is_medication=bool(add_is_med),
+                    is_medication=bool(add_is_med) or add_category == "medication",
                     preferred_time=add_pref_time,
                     is_recurring=bool(add_recurring),
                     recurrence_pattern=(add_recur_pattern if add_recurring else "daily"),
                 )
                 pet_obj.add_task(task)
+                _mark_user_dirty()
                 _persist_user_and_schedule()
                 st.success(f"Added task '{task.name}' to {pet_obj.name}")
 
@@ -159,9 +467,12 @@ with st.sidebar.expander("🗓️ Availability & Scheduling", expanded=True):
         elif not any(p.tasks for p in user.pets):
             st.error("No tasks yet. Add at least one task.")
         else:
-            user.availability = [f"{avail_start.strftime('%H:%M')}-{avail_end.strftime('%H:%M')}"]
-            scheduler = TaskScheduler(user)
-            schedule = scheduler.schedule_tasks(datetime.now())
+            new_availability = [f"{format_hhmm(avail_start)}-{format_hhmm(avail_end)}"]
+            if new_availability != user.availability:
+                user.availability = new_availability
+                _mark_user_dirty()
+            scheduler = get_scheduler(user, user.username, id(user))
+            schedule = compute_schedule(user, scheduler)
 
             st.session_state["last_schedule"] = schedule
             _persist_user_and_schedule(schedule)
@@ -170,6 +481,7 @@ with st.sidebar.expander("🗓️ Availability & Scheduling", expanded=True):
     if st.session_state.get("last_schedule"):
         if st.button("Clear schedule", key="sb_clear_schedule"):
             st.session_state["last_schedule"] = None
+            st.session_state.pop("schedule_memo", None)
             st.toast("Cleared.", icon="🧹")
 
 # -----------------------
@@ -178,9 +490,10 @@ with st.sidebar.expander("🗓️ Availability & Scheduling", expanded=True):
 st.title("🐾 PawPal+")
 st.caption("A task planner + scheduler for pet care.")
 
-tab1, tab2 = st.tabs(["📋 Tasks", "📅 Schedule"])
-
-with tab1:
+# Each tab body is a fragment, so its own widgets (filters, completion
+# checkboxes) rerun only that section instead of the whole script.
+@st.fragment
+def render_task_overview() -> None:
     st.subheader("Current Task Overview")
 
     if not user.pets:
@@ -191,22 +504,23 @@ with tab1:
                 if not p.tasks:
                     st.info("No tasks yet.")
                 else:
-                    task_rows = []
-                    for t in p.tasks:
-                        task_rows.append(
-                            {
-                                "Task": t.name,
-                                "Duration (min)": t.duration,
-                                "Priority": _priority_label(t.priority),
-                                "Category": getattr(t, "category", "general"),
-                                "Medication": "✓" if getattr(t, "is_medication", False) else "✗",
-                                "Recurring": "✓" if getattr(t, "is_recurring", False) else "✗",
-                                "Preferred": getattr(t, "preferred_time", "flexible"),
-                            }
+                    fingerprint = tuple(
+                        (
+                            t.task_id,
+                            t.name,
+                            t.duration,
+                            t.priority,
+                            t.category,
+                            t.is_medication,
+                            t.is_recurring,
+                            t.preferred_time,
                         )
-                    st.dataframe(task_rows, use_container_width=True, hide_index=True)
+                        for t in p.tasks
+                    )
+                    st.dataframe(_pet_task_table(p.pet_id, fingerprint), use_container_width=True, hide_index=True)
 
-with tab2:
+@st.fragment
+def render_schedule() -> None:
     st.subheader("Generated Schedule")
 
     schedule = st.session_state.get("last_schedule")
@@ -216,8 +530,7 @@ with tab2:
     else:
         # Filters
         with st.expander("Filters", expanded=True):
-            pet_filter_options = ["All"] + [p.name for p in user.pets]
-            pet_filter = st.selectbox("Filter by pet", options=pet_filter_options, index=0, key="flt_pet")
+            pet_filter = st.selectbox("Filter by pet", options=["All"] + pet_names, index=0, key="flt_pet")
             status_filter = st.selectbox(
                 "Filter by status", options=["All", "pending", "in_progress", "completed"], index=0, key="flt_status"
             )
@@ -229,92 +542,53 @@ with tab2:
 
         if schedule.scheduled_tasks:
             st.markdown("### Tasks (sorted by time)")
-            udm = UserDataManager()
-
-            rows = []
-            for st_task in schedule.get_tasks_by_time():
-                task_obj = getattr(st_task, "task", None)
-                task_name = task_obj.name if task_obj else st_task.task_id
-                pet_name = _pet_name_by_id(st_task.pet_id)
-                priority = getattr(task_obj, "priority", 0)
-                status = getattr(st_task, "status", "pending")
 
-                # Time string
-                try:
-                    time_str = f"{st_task.start_time.strftime('%H:%M')} - {st_task.end_time.strftime('%H:%M')}"
-                except Exception:
-                    time_str = ""
-
-                # Apply filters
-                if pet_filter != "All" and pet_name != pet_filter:
-                    continue
-                if status_filter != "All" and status != status_filter:
-                    continue
+            view_rows = _build_schedule_rows(
+                _schedule_view_fingerprint(schedule),
+                tuple((pid, p.name) for pid, p in pets_by_id.items()),
+                pet_filter,
+                status_filter,
+                time_from,
+                time_to,
+            )
+            # One editable table instead of a checkbox widget per task; the index
+            # carries each row's position in schedule.scheduled_tasks.
+            table = pd.DataFrame(
+                [(row[6] == "completed",) + row[1:] for row in view_rows],
+                columns=["Completed"] + SCHEDULE_COLUMNS,
+                index=[row[0] for row in view_rows],
+            )
+            edited = st.data_editor(
+                table,
+                column_config={"Completed": st.column_config.CheckboxColumn("Done")},
+                disabled=SCHEDULE_COLUMNS,
+                use_container_width=True,
+                hide_index=True,
+                key=f"schedule_editor_{st.session_state.get('schedule_editor_gen', 0)}",
+            )
+            changed = edited.index[edited["Completed"] != table["Completed"]]
+            now = datetime.now()
+            applied = failed = False
+            for idx in changed:
+                st_task = schedule.scheduled_tasks[idx]
+                completed = bool(edited.at[idx, "Completed"])
+                _set_task_completed(schedule, st_task, completed, now)
+                if (st_task.status == "completed") == completed:
+                    applied = True
+                else:
+                    failed = True
+            if failed:
+                # The editor would keep offering the rejected toggle as a change on
+                # every rerun; a new key starts it over from the table.
+                st.session_state["schedule_editor_gen"] = st.session_state.get("schedule_editor_gen", 0) + 1
+            if applied:
+                # Everything a completion touches is drawn inside this fragment
+                # (table, unscheduled list, archive), so only it needs to rerun.
+                # Fragment-scoped reruns are rejected during a full-app run.
                 try:
-                    if st_task.start_time and (st_task.start_time < time_from or st_task.start_time > time_to):
-                        continue
-                except Exception:
-                    pass
-
-                checked = st.checkbox(
-                    f"{time_str} — {task_name} ({pet_name})",
-                    value=(status == "completed"),
-                    key=f"chk-{st_task.task_id}",
-                )
-
-                # Toggle completion
-                if checked and status != "completed":
-                    try:
-                        pet_obj = next((p for p in user.pets if p.pet_id == st_task.pet_id), None)
-                        task_obj = getattr(st_task, "task", None)
-
-                        # If non-recurring, archive + remove from active pet tasks
-                        if task_obj and not getattr(task_obj, "is_recurring", False) and pet_obj:
-                            pet_obj.tasks = [t for t in pet_obj.tasks if t.task_id != task_obj.task_id]
-                            st.session_state["archived_tasks"].append(
-                                {
-                                    "task_id": task_obj.task_id,
-                                    "task_name": task_obj.name,
-                                    "pet_id": pet_obj.pet_id,
-                                    "pet_name": pet_obj.name,
-                                    "duration": task_obj.duration,
-                                    "priority": task_obj.priority,
-                                    "category": getattr(task_obj, "category", "general"),
-                                    "is_medication": getattr(task_obj, "is_medication", False),
-                                    "preferred_time": getattr(task_obj, "preferred_time", "flexible"),
-                                    "completed_at": datetime.now().isoformat(),
-                                }
-                            )
-                            st_task.status = "completed"
-                        else:
-                            try:
-                                st_task.mark_complete(datetime.now())
-                            except Exception:
-                                st_task.status = "completed"
-
-                        st.session_state["last_schedule"] = schedule
-                        _persist_user_and_schedule(schedule)
-                        st.success(f"Marked '{task_name}' completed.")
-                    except Exception as e:
-                        st.error(f"An error occurred: {e}")
-
-                elif (not checked) and status == "completed":
-                    st_task.status = "pending"
-                    st.session_state["last_schedule"] = schedule
-                    _persist_user_and_schedule(schedule)
-
-                rows.append(
-                    {
-                        "Time": time_str,
-                        "Task": task_name,
-                        "Pet": pet_name,
-                        "Priority": _priority_label(priority),
-                        "Duration": f"{getattr(task_obj, 'duration', '')} min",
-                        "Status": getattr(st_task, "status", "pending"),
-                    }
-                )
-
-            st.table(rows)
+                    st.rerun(scope="fragment")
+                except StreamlitAPIException:
+                    st.rerun()
 
             if schedule.has_conflicts():
                 st.warning("⚠️ Schedule Conflicts Detected")
@@ -326,63 +600,60 @@ with tab2:
 
         # Unscheduled tasks (best-effort)
         try:
-            scheduled_ids = {t.task_id for t in schedule.scheduled_tasks}
-            all_tasks = [t for p in user.pets for t in p.tasks]
-            unscheduled = [t for t in all_tasks if t.task_id not in scheduled_ids]
+            unscheduled_rows = _compute_unscheduled(
+                tuple((p.name, t.task_id, t.name, t.duration, t.priority) for p in user.pets for t in p.tasks),
+                tuple(t.task_id for t in schedule.scheduled_tasks),
+            )
         except Exception:
-            unscheduled = []
-
-        if unscheduled:
-            st.info(f"ℹ️ {len(unscheduled)} task(s) could not fit in your available time")
-            unscheduled_rows = [
-                {
-                    "Task": t.name,
-                    "Pet": _pet_name_by_id(t.pet_id),
-                    "Duration (min)": t.duration,
-                    "Priority": _priority_label(t.priority),
-                }
-                for t in unscheduled
-            ]
+            unscheduled_rows = []
+
+        if unscheduled_rows:
+            st.info(f"ℹ️ {len(unscheduled_rows)} task(s) could not fit in your available time")
             st.dataframe(unscheduled_rows, use_container_width=True, hide_index=True)
 
         with st.expander("📝 Detailed Explanation", expanded=False):
-            try:
-                st.text(schedule.get_explanation())
-            except Exception:
-                st.text(getattr(schedule, "explanation", ""))
+            st.text(schedule.get_explanation())
 
         with st.expander("📦 Archived Tasks", expanded=False):
-            archived = st.session_state.get("archived_tasks", [])
+            archived = st.session_state.get("archived_tasks", {})
             if not archived:
                 st.info("No archived tasks.")
             else:
-                for a in list(archived):
+                page_count = -(-len(archived) // ARCHIVE_PAGE_SIZE)
+                page = 1
+                if page_count > 1:
+                    # Deletes can leave the remembered page past the end.
+                    if st.session_state.get("arch_page", 1) > page_count:
+                        st.session_state["arch_page"] = page_count
+                    page = st.number_input("Page", min_value=1, max_value=page_count, key="arch_page")
+                start = (int(page) - 1) * ARCHIVE_PAGE_SIZE
+                page_items = list(islice(archived.items(), start, start + ARCHIVE_PAGE_SIZE))
+                for task_id, a in page_items:
+                    core = a["task"]
                     cols = st.columns([4, 1, 1])
-                    cols[0].write(f"{a.get('task_name')} — {a.get('pet_name')} (completed {a.get('completed_at')[:19]})")
+                    cols[0].write(f"{core['name']} — {a['pet_name']} (completed {a['completed_at'][:19]})")
 
-                    if cols[1].button("Restore", key=f"restore-{a.get('task_id')}"):
-                        pet_obj = next((p for p in user.pets if p.pet_id == a.get("pet_id")), None)
+                    if cols[1].button("Restore", key=f"restore-{task_id}"):
+                        pet_obj = _pet_by_id(core["pet_id"])
                         if pet_obj:
-                            restored = Task(
-                                task_id=a.get("task_id"),
-                                pet_id=pet_obj.pet_id,
-                                name=a.get("task_name"),
-                                duration=a.get("duration", 0),
-                                priority=a.get("priority", 3),
-                                category=a.get("category", "general"),
-                                is_medication=a.get("is_medication", False),
-                                preferred_time=a.get("preferred_time", "flexible"),
-                                is_recurring=False,
-                            )
+                            restored = Task(**core, is_recurring=False)
                             pet_obj.tasks.append(restored)
-                            st.session_state["archived_tasks"] = [
-                                x for x in st.session_state["archived_tasks"] if x.get("task_id") != a.get("task_id")
-                            ]
+                            _mark_user_dirty()
+                            archived.pop(task_id, None)
                             _persist_user_and_schedule()
-                            st.success(f"Restored '{a.get('task_name')}' to {pet_obj.name}")
+                            st.success(f"Restored '{restored.name}' to {pet_obj.name}")
 
-                    if cols[2].button("Delete", key=f"delete-arch-{a.get('task_id')}"):
-                        st.session_state["archived_tasks"] = [
-                            x for x in st.session_state["archived_tasks"] if x.get("task_id") != a.get("task_id")
-                        ]
+                    if cols[2].button("Delete", key=f"delete-arch-{task_id}"):
+                        archived.pop(task_id, None)
                         st.success("Deleted archived task")
+
+
+# st.tabs executes every tab body on each run; a radio gate only runs the visible one.
+active_view = st.radio(
+    "View", ["📋 Tasks", "📅 Schedule"], horizontal=True, label_visibility="collapsed", key="active_view"
+)
+
+if active_view == "📋 Tasks":
+    render_task_overview()
+else:
+    render_schedule()
@@ -162,9 +162,10 @@ def main():
     print("-" * 60)
     
     tasks_by_time = schedule.get_tasks_by_time()
+    pet_names = {p.pet_id: p.name for p in user.pets}
     if tasks_by_time:
         for i, scheduled_task in enumerate(tasks_by_time, 1):
-            pet_name = next((p.name for p in user.pets if p.pet_id == scheduled_task.pet_id), "Unknown")
+            pet_name = pet_names.get(scheduled_task.pet_id, "Unknown")
             print(f"\n{i}. {scheduled_task.task.name}")
             print(f"   Pet: {pet_name} | Time: {scheduled_task.get_time_string()} | Priority: {scheduled_task.task.priority}/5")
     
@@ -1,30 +1,79 @@
-from dataclasses import dataclass, field, asdict
-from datetime import datetime, time, timedelta
-from typing import List, Dict, Optional, Tuple
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, is_dataclass
+from datetime import date, datetime, time, timedelta
+from enum import IntEnum
+from functools import lru_cache
+from operator import attrgetter, is_
+from sys import intern
+from typing import Iterable, List, Dict, Optional, Tuple
+import bisect
+import heapq
 import json
 import os
+import re
+import stat
+import tempfile
+import threading
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:  # fall back to the stdlib encoder
+    orjson = None
+
 # ==================== USER ====================
-@dataclass
+@dataclass(slots=True)
 class User:
     username: str
     password: str
     availability: List[str] = field(default_factory=list)  # e.g., ["Mon-Fri: 9-5", "Sat: 10-12"]
     preferences: Dict[str, str] = field(default_factory=dict)
     pets: List['Pet'] = field(default_factory=list)
+    # (availability slot it was parsed from, (start, end)); filled by TaskScheduler._parse_availability.
+    _parsed_availability: Optional[Tuple[str, Tuple[time, time]]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
     
     def get_availability(self) -> List[str]:
         return self.availability
     
+    def to_dict(self) -> Dict:
+        """Return the JSON-ready fields saved for this user, pets and tasks included."""
+        return {
+            "username": self.username,
+            "password": self.password,
+            "availability": self.availability,
+            "preferences": self.preferences,
+            "pets": [pet.to_dict() for pet in self.pets],
+        }
+    
+    def tasks_flat(self) -> List['Task']:
+        """Return every task across all pets as a new list."""
+        return [task for pet in self.pets for task in pet.tasks]
+    
     def update_profile(self) -> None:
         """Updates user availability and preferences (called after form input)."""
         # In practice, this is called after Streamlit forms update the object
-        pass
+        self._parsed_availability = None
 
 
 # ==================== TASK ====================
-@dataclass
+class PreferredTime(IntEnum):
+    """Scheduling order for Task.preferred_time values (lower sorts first)."""
+    MORNING = 0
+    FLEXIBLE = 1
+    EVENING = 2
+
+
+# Task.preferred_time stays a plain string for the UI and saved JSON; rank it through this map.
+_PREFERRED_TIME_RANK = {pt.name.lower(): pt for pt in PreferredTime}
+_WEEKDAY_PATTERNS = frozenset({"weekly", "every_other_day"})
+_ONE_DAY = timedelta(days=1)
+_TWO_DAYS = timedelta(days=2)
+
+
+@dataclass(slots=True)
 class Task:
     task_id: str
     pet_id: str
@@ -39,7 +88,23 @@ class Task:
     recurrence_days: List[int] = field(default_factory=list)  # 0=Mon, 6=Sun (for weekly)
     next_due_date: Optional[datetime] = None  # Track next occurrence for recurring tasks
     
-    def get_details(self) -> Dict:
+    @property
+    def _sort_key(self) -> Tuple[int, int, int]:
+        """(medication group, -priority, preferred-time rank), for _prioritize_tasks.
+        
+        Medications ignore preferred_time.
+        """
+        if self.is_medication:
+            return (0, -self.priority, 0)
+        return (1, -self.priority, _PREFERRED_TIME_RANK.get(self.preferred_time, PreferredTime.FLEXIBLE))
+    
+    @property
+    def _weekdays_only(self) -> bool:
+        """Whether this task is limited to the weekdays in recurrence_days."""
+        return self.is_recurring and self.recurrence_pattern in _WEEKDAY_PATTERNS
+    
+    def to_dict(self) -> Dict:
+        """Return the JSON-ready fields saved for this task."""
         return {
             "task_id": self.task_id,
             "pet_id": self.pet_id,
@@ -52,28 +117,39 @@ class Task:
             "is_recurring": self.is_recurring,
             "recurrence_pattern": self.recurrence_pattern,
             "recurrence_days": self.recurrence_days,
+            "next_due_date": self.next_due_date.isoformat() if self.next_due_date else None,
         }
     
+    def get_details(self) -> Dict:
+        return self.to_dict()
+    
     def update_priority(self, new_priority: int) -> None:
         """Update task priority (1-5, 5 being highest)."""
         if 1 <= new_priority <= 5:
             self.priority = new_priority
     
     def should_occur_on_date(self, date: datetime) -> bool:
-        """Check if this recurring task should occur on the given date."""
-        if not self.is_recurring:
-            return True
+        """Check if this recurring task should occur on the given date.
         
-        if self.recurrence_pattern == "daily":
-            return True
-        elif self.recurrence_pattern == "weekly":
-            return date.weekday() in self.recurrence_days
-        elif self.recurrence_pattern == "every_other_day":
-            # Simplified: check if day is in recurrence_days (assumes caller handles logic)
+        Non-recurring and daily tasks occur every day. Weekly and every_other_day tasks
+        occur on the weekdays in recurrence_days (every_other_day is simplified; the
+        caller handles the alternation).
+        """
+        if self._weekdays_only:
             return date.weekday() in self.recurrence_days
-        
         return True
     
+    def occurrences(self, start: datetime, end: datetime) -> List[datetime]:
+        """Return every date from start through end (inclusive) on which this task occurs.
+        
+        Same rules as should_occur_on_date, walked in a single pass over the range.
+        """
+        days = [start + timedelta(days=i) for i in range((end - start).days + 1)]
+        if not self._weekdays_only:
+            return days
+        weekdays = self.recurrence_days
+        return [d for d in days if d.weekday() in weekdays]
+    
     def calculate_next_due_date(self, current_date: datetime) -> Optional[datetime]:
         """Calculate the next due date for a recurring task using timedelta.
         
@@ -86,27 +162,34 @@ class Task:
         if not self.is_recurring:
             return None
         
-        if self.recurrence_pattern == "daily":
-            # Next occurrence: today + 1 day
-            return current_date + timedelta(days=1)
-        elif self.recurrence_pattern == "weekly":
-            # Next occurrence: find the next matching weekday
-            days_ahead = 7
-            for days_offset in range(1, 8):
-                next_date = current_date + timedelta(days=days_offset)
-                if next_date.weekday() in self.recurrence_days:
-                    days_ahead = days_offset
-                    break
-            return current_date + timedelta(days=days_ahead)
-        elif self.recurrence_pattern == "every_other_day":
-            # Next occurrence: today + 2 days
-            return current_date + timedelta(days=2)
-        
-        return None
+        step = _NEXT_DUE_STEPS.get(self.recurrence_pattern)
+        return current_date + step(self, current_date) if step else None
+
+
+# How far calculate_next_due_date moves a completed task, per recurrence pattern
+def _daily_step(task: Task, current_date: datetime) -> timedelta:
+    return _ONE_DAY
+
+
+def _weekly_step(task: Task, current_date: datetime) -> timedelta:
+    # Days (1-7) to the next matching weekday; a full week if none match
+    weekday = current_date.weekday()
+    return timedelta(days=min(((d - weekday - 1) % 7 + 1 for d in task.recurrence_days if 0 <= d <= 6), default=7))
+
+
+def _every_other_day_step(task: Task, current_date: datetime) -> timedelta:
+    return _TWO_DAYS
+
+
+_NEXT_DUE_STEPS = {
+    "daily": _daily_step,
+    "weekly": _weekly_step,
+    "every_other_day": _every_other_day_step,
+}
 
 
 # ==================== PET ====================
-@dataclass
+@dataclass(slots=True)
 class Pet:
     pet_id: str
     name: str
@@ -117,7 +200,8 @@ class Pet:
     user_preferences: Dict[str, str] = field(default_factory=dict)
     tasks: List[Task] = field(default_factory=list)
     
-    def get_profile(self) -> Dict:
+    def to_dict(self) -> Dict:
+        """Return the JSON-ready fields saved for this pet, tasks included."""
         return {
             "pet_id": self.pet_id,
             "name": self.name,
@@ -126,9 +210,12 @@ class Pet:
             "health_info": self.health_info,
             "task_priorities": self.task_priorities,
             "user_preferences": self.user_preferences,
-            "tasks": [task.get_details() for task in self.tasks],
+            "tasks": [task.to_dict() for task in self.tasks],
         }
     
+    def get_profile(self) -> Dict:
+        return self.to_dict()
+    
     def update_profile(self) -> None:
         """Updates pet health info and preferences (called after form input)."""
         # In practice, this is called after Streamlit forms update the object
@@ -137,10 +224,14 @@ class Pet:
     def add_task(self, task: Task) -> None:
         """Add a task to this pet's task list."""
         self.tasks.append(task)
+    
+    def extend_tasks(self, tasks: Iterable[Task]) -> None:
+        """Add several tasks at once, growing the task list in one step."""
+        self.tasks.extend(tasks)
 
 
 # ==================== SCHEDULED TASK ====================
-@dataclass
+@dataclass(slots=True)
 class ScheduledTask:
     task_id: str
     start_time: time
@@ -150,6 +241,16 @@ class ScheduledTask:
     status: str = "pending"  # pending, in_progress, completed
     scheduled_date: Optional[datetime] = None  # Track which date this instance is for
     
+    # start_time/end_time as minutes since midnight; used for ordering and overlap
+    # checks at minute resolution.
+    @property
+    def start_min(self) -> int:
+        return _minute_of_day(self.start_time)
+    
+    @property
+    def end_min(self) -> int:
+        return _minute_of_day(self.end_time)
+    
     def mark_complete(self, current_date: datetime = None) -> str:
         """Mark this scheduled task as completed and reschedule if recurring.
         
@@ -175,7 +276,7 @@ class ScheduledTask:
             next_due = self.task.calculate_next_due_date(current_date)
             self.task.next_due_date = next_due
             
-            return f"✓ Completed '{self.task.name}'. Next due: {next_due.strftime('%A, %B %d, %Y') if next_due else 'N/A'}"
+            return f"✓ Completed '{self.task.name}'. Next due: {_fmt_date(next_due) if next_due else 'N/A'}"
         
         return f"✓ Completed '{self.task.name if self.task else 'Unknown task'}'."
     
@@ -185,78 +286,280 @@ class ScheduledTask:
         self.end_time = new_end
         self.status = "pending"
     
+    def to_dict(self) -> Dict:
+        """Return the JSON-ready fields saved for this slot (the task itself is saved with the user)."""
+        return {
+            "task_id": self.task_id,
+            "start_time": self.start_time.isoformat(),
+            "end_time": self.end_time.isoformat(),
+            "pet_id": self.pet_id,
+            "status": self.status,
+            "task_name": self.task.name if self.task else "Unknown",
+        }
+    
     def get_time_string(self) -> str:
         """Return time range as 'HH:MM-HH:MM' string."""
-        return f"{self.start_time.strftime('%H:%M')}-{self.end_time.strftime('%H:%M')}"
+        return f"{format_hhmm(self.start_time)}-{format_hhmm(self.end_time)}"
     
     def overlaps_with(self, other: 'ScheduledTask') -> bool:
         """Check if this task overlaps with another scheduled task."""
-        return (self.start_time < other.end_time and self.end_time > other.start_time)
+        return (self.start_min < other.end_min and self.end_min > other.start_min)
+
+
+_MINUTES_PER_DAY = 24 * 60
+# Every minute of the day as a time object, indexed by minute of day, so placing a
+# task is a list lookup rather than a validated time() construction.
+_TIME_OF_MINUTE = [time(*divmod(m, 60)) for m in range(_MINUTES_PER_DAY)]
+
+
+def _minute_of_day(t: time) -> int:
+    return t.hour * 60 + t.minute
+
+
+_start_key = attrgetter("start_min")
+_time_fields = attrgetter("start_time", "end_time")
+_group_fields = attrgetter("pet_id", "status")
+
+
+def format_hhmm(t: time) -> str:
+    """Return t as 'HH:MM', the same text as t.strftime('%H:%M').
+    
+    %H:%M has no locale-dependent parts, so plain int formatting is enough and skips
+    strftime's format parser.
+    """
+    return f"{t.hour:02d}:{t.minute:02d}"
+
+
+# Day and month names do depend on the locale; schedules reuse a handful of dates,
+# so format each one once.
+@lru_cache(maxsize=1024)
+def _fmt_date(d: date) -> str:
+    return d.strftime('%A, %B %d, %Y')
+
+
+def _sweep_conflicts(tasks: List[ScheduledTask]) -> List[Tuple[ScheduledTask, ScheduledTask]]:
+    """Return every overlapping pair using a sweep over start times.
+    
+    Tasks are visited by start time while a min-heap holds the end times of tasks
+    still running; anything left on the heap when a task starts overlaps it. Runs in
+    O(n log n + k) for k conflicts. Pairs come back in input order, matching a
+    pairwise i < j scan.
+    """
+    if len(tasks) < 2:
+        return []
+    if all(a.start_min <= b.start_min for a, b in zip(tasks, tasks[1:])):
+        return _scan_sorted_conflicts(tasks)
+    order = sorted(range(len(tasks)), key=lambda i: tasks[i].start_min)
+    active: List[Tuple[int, int]] = []  # (end minute, input index)
+    pairs = []
+    for i in order:
+        task = tasks[i]
+        while active and active[0][0] <= task.start_min:
+            heapq.heappop(active)
+        for _, j in active:
+            # Zero-length tasks starting together don't overlap (see overlaps_with)
+            if tasks[j].start_min < task.end_min:
+                pairs.append((j, i) if j < i else (i, j))
+        heapq.heappush(active, (task.end_min, i))
+    pairs.sort()
+    return [(tasks[i], tasks[j]) for i, j in pairs]
+
+
+
+def _scan_sorted_conflicts(tasks: List[ScheduledTask]) -> List[Tuple[ScheduledTask, ScheduledTask]]:
+    """Return every overlapping pair for tasks already in start-time order.
+    
+    Each task is compared only with the successors that start before it ends; the
+    first one that doesn't ends the scan, since all later ones start later still.
+    O(n + k) for k conflicts, so the scheduler's own back-to-back output costs one
+    comparison per task. Pairs come out in input order without sorting.
+    """
+    pairs = []
+    for i, task in enumerate(tasks):
+        for j in range(i + 1, len(tasks)):
+            other = tasks[j]
+            if other.start_min >= task.end_min:
+                break
+            # Zero-length tasks starting together don't overlap (see overlaps_with)
+            if task.start_min < other.end_min:
+                pairs.append((task, other))
+    return pairs
 
 
 # ==================== DAILY SCHEDULE ====================
-@dataclass
+@dataclass(slots=True)
 class DailySchedule:
     user_id: str
     date: datetime
     scheduled_tasks: List[ScheduledTask] = field(default_factory=list)
     explanation: str = ""
     conflicts: List[Tuple[ScheduledTask, ScheduledTask]] = field(default_factory=list)
+    # Lazily built ((ids, (start_time, end_time)) of scheduled_tasks in list order, tasks
+    # sorted by start, their start and end minutes); stale once that key stops matching.
+    _index: Optional[Tuple[tuple, List[ScheduledTask], array, array]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    # Lazily built ((time-ordered list, (pet_id, status) of each task in it), {pet_id: tasks},
+    # {status: tasks}), each bucket in time order; stale once those pairs stop matching.
+    _groups: Optional[Tuple[Tuple[List[ScheduledTask], Tuple[Tuple[str, str], ...]],
+                            Dict[str, List[ScheduledTask]], Dict[str, List[ScheduledTask]]]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    
+    def _index_key(self) -> tuple:
+        """What the time index depends on: which tasks are listed, and their times."""
+        tasks = self.scheduled_tasks
+        return (tuple(map(id, tasks)), tuple(map(_time_fields, tasks)))
+    
+    def _time_index(self) -> Tuple[tuple, List[ScheduledTask], array, array]:
+        """Return (index key, tasks sorted by start, start minutes, end minutes), rebuilding if stale.
+        
+        The minute columns are parallel to the sorted list and packed as uint16 arrays
+        (a day is 1440 minutes), so range queries scan ints instead of time objects.
+        
+        Any change to the contents of scheduled_tasks (append, remove, replacing an item)
+        or to a task's start or end time changes the key, which is built in two C-level
+        passes. The index keeps the tasks alive, so their ids can't be reused.
+        """
+        index = self._index
+        key = self._index_key()
+        if index is None or index[0] != key:
+            ordered = sorted(self.scheduled_tasks, key=_start_key)
+            index = (
+                key,
+                ordered,
+                array("H", [t.start_min for t in ordered]),
+                array("H", [t.end_min for t in ordered]),
+            )
+            self._index = index
+        return index
+    
+    def _group_index(self) -> Tuple[Dict[str, List[ScheduledTask]], Dict[str, List[ScheduledTask]]]:
+        """Return time-ordered task buckets keyed by pet_id and by status.
+        
+        The buckets are reused while the time index is unchanged and every task still has
+        the pet_id and status they were grouped by (one C-level pass over the tasks).
+        """
+        ordered = self._time_index()[1]
+        fields = tuple(map(_group_fields, ordered))
+        groups = self._groups
+        if groups is None or groups[0][0] is not ordered or groups[0][1] != fields:
+            by_pet: Dict[str, List[ScheduledTask]] = {}
+            by_status: Dict[str, List[ScheduledTask]] = {}
+            for t in ordered:
+                by_pet.setdefault(t.pet_id, []).append(t)
+                by_status.setdefault(t.status, []).append(t)
+            groups = ((ordered, fields), by_pet, by_status)
+            self._groups = groups
+        return groups[1:]
+    
+    def _ordered_pos(self, task: ScheduledTask) -> Optional[int]:
+        """Position of task in the cached start order (bisect on its start minute), or None."""
+        _, ordered, starts, _ = self._index
+        start = task.start_min
+        for i in range(bisect.bisect_left(starts, start), bisect.bisect_right(starts, start)):
+            if ordered[i] is task:
+                return i
+        return None
+    
+    def _bucket_insert(self, bucket: List[ScheduledTask], task: ScheduledTask) -> None:
+        """Insert an indexed task into a group bucket, keeping the bucket in start order."""
+        bisect.insort(bucket, task, key=self._ordered_pos)
+    
+    def add_task(self, scheduled_task: ScheduledTask) -> None:
+        """Insert a task, keeping scheduled_tasks in start-time order (after equal starts).
+        
+        When scheduled_tasks is already in start order (as the scheduler builds it) and
+        indexed, the task is inserted into the cached order, minute columns and groups
+        too, so the next query doesn't rebuild them.
+        """
+        tasks = self.scheduled_tasks
+        index = self._index
+        in_order = (
+            index is not None
+            and index[0] == self._index_key()
+            and all(map(is_, index[1], tasks))
+        )
+        i = bisect.bisect_right(tasks, scheduled_task.start_min, key=_start_key)
+        tasks.insert(i, scheduled_task)
+        if not in_order:
+            return
+        _, ordered, starts, ends = index
+        fields = tuple(map(_group_fields, ordered))
+        ordered.insert(i, scheduled_task)
+        starts.insert(i, scheduled_task.start_min)
+        ends.insert(i, scheduled_task.end_min)
+        self._index = (self._index_key(), ordered, starts, ends)
+        groups = self._groups
+        if groups is not None and groups[0][0] is ordered and groups[0][1] == fields:
+            _, by_pet, by_status = groups
+            self._bucket_insert(by_pet.setdefault(scheduled_task.pet_id, []), scheduled_task)
+            self._bucket_insert(by_status.setdefault(scheduled_task.status, []), scheduled_task)
+            fields = fields[:i] + (_group_fields(scheduled_task),) + fields[i:]
+            self._groups = ((ordered, fields), by_pet, by_status)
     
     def get_tasks_by_time(self) -> List[ScheduledTask]:
         """Return tasks sorted by start time (HH:MM format)."""
-        return sorted(
-            self.scheduled_tasks,
-            key=lambda t: (t.start_time.hour, t.start_time.minute)
-        )
+        # Copy so callers can't reorder the cached index
+        return list(self._time_index()[1])
     
     def get_tasks_by_pet(self, pet_id: str) -> List[ScheduledTask]:
         """Filter and return tasks for a specific pet, sorted by time."""
-        pet_tasks = [t for t in self.scheduled_tasks if t.pet_id == pet_id]
-        return sorted(
-            pet_tasks,
-            key=lambda t: (t.start_time.hour, t.start_time.minute)
-        )
+        return list(self._group_index()[0].get(pet_id, ()))
     
     def get_tasks_by_status(self, status: str) -> List[ScheduledTask]:
         """Filter and return tasks by status (pending, in_progress, completed), sorted by time."""
-        status_tasks = [t for t in self.scheduled_tasks if t.status == status]
-        return sorted(
-            status_tasks,
-            key=lambda t: (t.start_time.hour, t.start_time.minute)
-        )
+        return list(self._group_index()[1].get(status, ()))
     
     def get_tasks_in_time_range(self, start_time: time, end_time: time) -> List[ScheduledTask]:
         """Get all tasks that occur within a time range, sorted by start time."""
-        range_tasks = [
-            t for t in self.scheduled_tasks
-            if t.start_time >= start_time and t.end_time <= end_time
-        ]
-        return sorted(
-            range_tasks,
-            key=lambda t: (t.start_time.hour, t.start_time.minute)
-        )
+        _, ordered, starts, ends = self._time_index()
+        end_minute = _minute_of_day(end_time)
+        lo = bisect.bisect_left(starts, _minute_of_day(start_time))
+        hi = bisect.bisect_right(starts, end_minute)
+        return [ordered[i] for i in range(lo, hi) if ends[i] <= end_minute]
+    
+    def to_dict(self) -> Dict:
+        """Return the JSON-ready fields saved for this schedule."""
+        return {
+            "user_id": self.user_id,
+            "date": self.date.isoformat(),
+            "explanation": self.explanation,
+            "scheduled_tasks": [st.to_dict() for st in self.scheduled_tasks],
+        }
     
     def get_explanation(self) -> str:
         """Return the scheduling explanation."""
         return self.explanation
     
+    def detect_conflicts(self) -> List[Tuple[ScheduledTask, ScheduledTask]]:
+        """Recompute and store the overlapping task pairs for the current schedule."""
+        self.conflicts = _sweep_conflicts(self.scheduled_tasks)
+        return self.conflicts
+    
     def has_conflicts(self) -> bool:
-        """Check if schedule has any time conflicts."""
-        return len(self.conflicts) > 0
+        """Check if schedule has any time conflicts (as of the last detect_conflicts)."""
+        return bool(self.conflicts)
     
     def get_conflict_summary(self) -> str:
         """Return a summary of conflicts in the schedule."""
         if not self.conflicts:
             return "No conflicts detected."
         
-        summary = f"Found {len(self.conflicts)} conflict(s):\n"
-        for task1, task2 in self.conflicts:
-            summary += f"  • {task1.task.name} ({task1.get_time_string()}) overlaps with {task2.task.name} ({task2.get_time_string()})\n"
-        return summary
+        lines = [f"Found {len(self.conflicts)} conflict(s):\n"]
+        lines.extend(
+            f"  • {task1.task.name} ({task1.get_time_string()}) overlaps with {task2.task.name} ({task2.get_time_string()})\n"
+            for task1, task2 in self.conflicts
+        )
+        return "".join(lines)
 
 
 # ==================== TASK SCHEDULER ====================
+# "H[:MM]-H[:MM]" with optional spaces around the dash
+_AVAILABILITY_RE = re.compile(r"\s*(\d{1,2})(?::(\d{1,2}))?\s*-\s*(\d{1,2})(?::(\d{1,2}))?\s*")
+_DEFAULT_AVAILABILITY = (time(9, 0), time(17, 0))
+
+
 class TaskScheduler:
     def __init__(self, user: User):
         self.user = user
@@ -265,11 +568,7 @@ class TaskScheduler:
     def schedule_tasks(self, date: datetime) -> DailySchedule:
         """Generate daily schedule based on user availability and task priorities."""
         # Get all tasks from all pets that should occur on this date
-        all_tasks = []
-        for pet in self.pets:
-            for task in pet.tasks:
-                if task.should_occur_on_date(date):
-                    all_tasks.append(task)
+        all_tasks = [task for task in self.user.tasks_flat() if task.should_occur_on_date(date)]
         
         # Prioritize tasks (medications first, then by priority)
         prioritized_tasks = self._prioritize_tasks(all_tasks)
@@ -285,7 +584,7 @@ class TaskScheduler:
         )
         
         # Detect conflicts
-        schedule.conflicts = self._detect_conflicts(scheduled_tasks)
+        schedule.detect_conflicts()
         
         # Generate explanation
         schedule.explanation = self._generate_explanation(schedule, all_tasks, scheduled_tasks)
@@ -293,75 +592,49 @@ class TaskScheduler:
         return schedule
     
     def _prioritize_tasks(self, tasks: List[Task]) -> List[Task]:
-        """Sort tasks: medications first, then by priority, then by preferred time (morning->flexible->evening)."""
-        medications = [t for t in tasks if t.is_medication]
-        non_medications = [t for t in tasks if not t.is_medication]
+        """Sort tasks: medications first, then by priority, then by preferred time (morning->flexible->evening).
         
-        # Sort medications by priority
-        medications.sort(key=lambda t: t.priority, reverse=True)
-        
-        # Sort non-medications: by priority (desc), then by preferred_time (morning > flexible > evening)
-        time_order = {"morning": 0, "flexible": 1, "evening": 2}
-        non_medications.sort(key=lambda t: (-t.priority, time_order.get(t.preferred_time, 1)))
-        
-        return medications + non_medications
+        Medications are ordered by priority alone. Task._sort_key encodes all of this,
+        so a single stable sort does it.
+        """
+        return sorted(tasks, key=attrgetter("_sort_key"))
     
     def _fit_tasks_in_schedule(self, prioritized_tasks: List[Task], date: datetime) -> List[ScheduledTask]:
         """Fit tasks into user's available time slots."""
         scheduled_tasks = []
         
-        # Parse user availability into time slots
-        available_slots = self._parse_availability(date)
-        
-        # Current time pointer for scheduling
-        current_time = available_slots[0] if available_slots else time(9, 0)
-        available_end = available_slots[1] if len(available_slots) > 1 else time(17, 0)
+        # Parse user availability; always a (start, end) pair
+        available_start, available_end = self._parse_availability(date)
         
-        scheduled_set = set()  # Track which tasks got scheduled
+        # Current time pointer for scheduling, in minutes since midnight
+        current_minute = _minute_of_day(available_start)
+        end_minute = _minute_of_day(available_end)
         
         for task in prioritized_tasks:
-            task_duration = task.duration
-            task_start = current_time
-            
-            # Calculate end time
-            hours = task_duration // 60
-            minutes = task_duration % 60
-            end_hour = task_start.hour + hours
-            end_minute = task_start.minute + minutes
-            
-            if end_minute >= 60:
-                end_hour += 1
-                end_minute -= 60
-            
-            task_end = time(end_hour, end_minute)
+            task_end_minute = current_minute + task.duration
             
-            # Check if task fits in available time
-            if task_end <= available_end or task.is_medication:
+            # Check if task fits in available time (medications are always placed,
+            # but nothing can run past midnight)
+            if (task_end_minute <= end_minute or task.is_medication) and task_end_minute < _MINUTES_PER_DAY:
                 scheduled_task = ScheduledTask(
                     task_id=task.task_id,
-                    start_time=task_start,
-                    end_time=task_end,
+                    start_time=_TIME_OF_MINUTE[current_minute],
+                    end_time=_TIME_OF_MINUTE[task_end_minute],
                     pet_id=task.pet_id,
                     task=task,
                     status="pending",
                     scheduled_date=date,
                 )
                 scheduled_tasks.append(scheduled_task)
-                scheduled_set.add(task.task_id)
-                current_time = task_end
+                current_minute = task_end_minute
         
-        return sorted(scheduled_tasks, key=lambda t: (t.start_time.hour, t.start_time.minute))
+        # Every placement (medications included) starts at the advancing cursor, so the
+        # list is already in start-time order.
+        return scheduled_tasks
     
     def _detect_conflicts(self, scheduled_tasks: List[ScheduledTask]) -> List[Tuple[ScheduledTask, ScheduledTask]]:
-        """Detect overlapping tasks in the schedule."""
-        conflicts = []
-        
-        for i, task1 in enumerate(scheduled_tasks):
-            for task2 in scheduled_tasks[i + 1:]:
-                if task1.overlaps_with(task2):
-                    conflicts.append((task1, task2))
-        
-        return conflicts
+        """Detect overlapping tasks in the schedule (sweep over start times, see _sweep_conflicts)."""
+        return _sweep_conflicts(scheduled_tasks)
     
     def _generate_explanation(self, schedule: DailySchedule, all_tasks: List[Task], 
                              scheduled_tasks: List[ScheduledTask]) -> str:
@@ -369,104 +642,129 @@ class TaskScheduler:
         scheduled_ids = {t.task_id for t in scheduled_tasks}
         unscheduled = [t for t in all_tasks if t.task_id not in scheduled_ids]
         
-        explanation = "Daily Schedule Generated:\n\n"
+        pet_names = {p.pet_id: p.name for p in self.pets}
+        parts = ["Daily Schedule Generated:\n\n"]
         
         if scheduled_tasks:
-            explanation += "Scheduled Tasks (sorted by time):\n"
-            for st in schedule.get_tasks_by_time():
-                explanation += f"  • {st.task.name} ({st.pet_id}): {st.start_time.strftime('%H:%M')} - {st.end_time.strftime('%H:%M')} [Priority: {st.task.priority}]\n"
+            parts.append("Scheduled Tasks (sorted by time):\n")
+            parts.extend(
+                f"  • {st.task.name} ({pet_names.get(st.pet_id, st.pet_id)}): {format_hhmm(st.start_time)} - {format_hhmm(st.end_time)} [Priority: {st.task.priority}]\n"
+                for st in schedule.get_tasks_by_time()
+            )
         
         if unscheduled:
-            explanation += "\nUnable to Schedule (insufficient time):\n"
-            for task in unscheduled:
-                explanation += f"  • {task.name} ({task.pet_id}) - Duration: {task.duration} min [Priority: {task.priority}]\n"
+            parts.append("\nUnable to Schedule (insufficient time):\n")
+            parts.extend(
+                f"  • {task.name} ({pet_names.get(task.pet_id, task.pet_id)}) - Duration: {task.duration} min [Priority: {task.priority}]\n"
+                for task in unscheduled
+            )
         
         if schedule.has_conflicts():
-            explanation += "\n" + schedule.get_conflict_summary()
+            parts.append("\n" + schedule.get_conflict_summary())
         
-        explanation += f"\nBased on your availability: {', '.join(self.user.availability)}"
-        return explanation
+        parts.append(f"\nBased on your availability: {', '.join(self.user.availability)}")
+        return "".join(parts)
     
-    def _parse_availability(self, date: datetime) -> List[time]:
-        """Parse availability strings into time objects."""
+    def _parse_availability(self, date: datetime) -> Tuple[time, time]:
+        """Parse availability strings into a (start, end) pair of time objects."""
         # Simplified parser: assumes format like "9:00-17:00" or "9-5"
         if not self.user.availability:
-            return [time(9, 0), time(17, 0)]
+            return _DEFAULT_AVAILABILITY
         
         # For now, just use the first availability slot
         avail_str = self.user.availability[0]
-        try:
-            if "-" in avail_str:
-                parts = avail_str.split("-")
-                start_str = parts[0].strip()
-                end_str = parts[1].strip()
-                
-                # Handle both "9" and "9:00" formats
-                if ":" in start_str:
-                    start_time = datetime.strptime(start_str, "%H:%M").time()
-                else:
-                    start_time = time(int(start_str), 0)
-                
-                if ":" in end_str:
-                    end_time = datetime.strptime(end_str, "%H:%M").time()
-                else:
-                    end_time = time(int(end_str), 0)
-                
-                return [start_time, end_time]
-        except:
-            pass
-        
-        # Default fallback
-        return [time(9, 0), time(17, 0)]
+        cached = self.user._parsed_availability
+        if cached is not None and cached[0] == avail_str:
+            return cached[1]
+        
+        slots = _DEFAULT_AVAILABILITY
+        # Handle both "9" and "9:00" formats; anything else keeps the default
+        m = _AVAILABILITY_RE.fullmatch(avail_str)
+        if m:
+            start_hour, start_minute = int(m[1]), int(m[2] or 0)
+            end_hour, end_minute = int(m[3]), int(m[4] or 0)
+            if start_hour < 24 and end_hour < 24 and start_minute < 60 and end_minute < 60:
+                slots = (time(start_hour, start_minute), time(end_hour, end_minute))
+        
+        # Keyed by the slot string so reassigning user.availability re-parses
+        self.user._parsed_availability = (avail_str, slots)
+        return slots
 
 
 # ==================== USER DATA MANAGER ====================
+def _dump_json_bytes(data, pretty: bool = False) -> bytes:
+    """Encode a dict or dataclass as JSON bytes (compact unless pretty).
+    
+    orjson encodes dataclasses natively, leaving out underscore-prefixed cache fields,
+    so no intermediate dict is built; the stdlib fallback goes through to_dict().
+    """
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 if pretty else None)
+    if is_dataclass(data):
+        data = data.to_dict()
+    if pretty:
+        return json.dumps(data, indent=2).encode("utf-8")
+    return json.dumps(data, separators=(",", ":")).encode("utf-8")
+
+
+def _load_json_bytes(payload: bytes):
+    """Decode JSON bytes, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(payload)
+    return json.loads(payload)
+
+
+# mkstemp creates files as 0o600; new data files get the usual open() mode instead.
+# Reading the umask means setting it, so do it once at import.
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+_NEW_FILE_MODE = 0o666 & ~_UMASK
+
+
+def _write_atomic(filepath: str, payload: bytes) -> None:
+    """Write to a temp file next to filepath, then swap it in so readers never see a partial file.
+    
+    The temp file gets a unique name, so concurrent writers (other processes included)
+    never swap in each other's half-written files. It takes the mode of the file it
+    replaces (or the default for a new file) before the swap.
+    """
+    directory, name = os.path.split(filepath)
+    fd, tmp_path = tempfile.mkstemp(dir=directory or ".", prefix=f"{name}.", suffix=".tmp")
+    try:
+        try:
+            f = os.fdopen(fd, 'wb')
+        except BaseException:
+            os.close(fd)
+            raise
+        with f:
+            try:
+                mode = stat.S_IMODE(os.stat(filepath).st_mode)
+            except FileNotFoundError:
+                mode = _NEW_FILE_MODE
+            if hasattr(os, "fchmod"):  # POSIX only
+                os.fchmod(fd, mode)
+            f.write(payload)
+        os.replace(tmp_path, filepath)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
 class UserDataManager:
-    def __init__(self, storage_path: str = "users/"):
+    def __init__(self, storage_path: str = "users/", pretty: bool = False):
         self.storage_path = storage_path
+        self.pretty = pretty  # indent saved JSON for hand-inspection
+        # One manager may be shared by several threads (the app flushes saves from timer
+        # threads); writes go through this lock.
+        self._lock = threading.Lock()
         Path(self.storage_path).mkdir(parents=True, exist_ok=True)
     
     def save_user(self, user: User) -> None:
         """Save user with all nested pets and tasks to JSON."""
-        user_data = {
-            "username": user.username,
-            "password": user.password,
-            "availability": user.availability,
-            "preferences": user.preferences,
-            "pets": [
-                {
-                    "pet_id": pet.pet_id,
-                    "name": pet.name,
-                    "species": pet.species,
-                    "age": pet.age,
-                    "health_info": pet.health_info,
-                    "task_priorities": pet.task_priorities,
-                    "user_preferences": pet.user_preferences,
-                    "tasks": [
-                        {
-                            "task_id": task.task_id,
-                            "pet_id": task.pet_id,
-                            "name": task.name,
-                            "duration": task.duration,
-                            "priority": task.priority,
-                            "category": task.category,
-                            "is_medication": task.is_medication,
-                            "preferred_time": task.preferred_time,
-                            "is_recurring": task.is_recurring,
-                            "recurrence_pattern": task.recurrence_pattern,
-                            "recurrence_days": task.recurrence_days,
-                            "next_due_date": task.next_due_date.isoformat() if task.next_due_date else None,
-                        }
-                        for task in pet.tasks
-                    ],
-                }
-                for pet in user.pets
-            ],
-        }
-        
         filepath = os.path.join(self.storage_path, f"{user.username}.json")
-        with open(filepath, 'w') as f:
-            json.dump(user_data, f, indent=2)
+        payload = _dump_json_bytes(user, self.pretty)
+        with self._lock:
+            _write_atomic(filepath, payload)
     
     def load_user(self, username: str) -> Optional[User]:
         """Load user with all nested pets and tasks from JSON."""
@@ -475,24 +773,41 @@ class UserDataManager:
         if not os.path.exists(filepath):
             return None
         
-        with open(filepath, 'r') as f:
-            user_data = json.load(f)
+        return self._decode_user(filepath)
+    
+    def load_all_users(self) -> List[User]:
+        """Load every saved user in the storage directory.
         
-        # Reconstruct pets and tasks
+        scandir reports file types without a stat per entry, and the files are read
+        and decoded on a thread pool so their disk reads overlap.
+        """
+        with os.scandir(self.storage_path) as it:
+            paths = [e.path for e in it if e.name.endswith(".json") and e.is_file()]
+        if len(paths) < 2:
+            return [self._decode_user(path) for path in paths]
+        with ThreadPoolExecutor() as pool:
+            return list(pool.map(self._decode_user, paths))
+    
+    def _decode_user(self, filepath: str) -> User:
+        """Rebuild a User with its pets and tasks from a saved user file."""
+        user_data = _load_json_bytes(Path(filepath).read_bytes())
+        
+        # Reconstruct pets and tasks. Enum-like strings and ids are interned so the
+        # dict keys and == checks in filters and indexes compare by identity first.
         pets = []
         for pet_data in user_data.get("pets", []):
             tasks = [
                 Task(
                     task_id=task_data["task_id"],
-                    pet_id=task_data["pet_id"],
+                    pet_id=intern(task_data["pet_id"]),
                     name=task_data["name"],
                     duration=task_data["duration"],
                     priority=task_data["priority"],
-                    category=task_data["category"],
+                    category=intern(task_data["category"]),
                     is_medication=task_data["is_medication"],
-                    preferred_time=task_data.get("preferred_time", "flexible"),
+                    preferred_time=intern(task_data.get("preferred_time", "flexible")),
                     is_recurring=task_data.get("is_recurring", False),
-                    recurrence_pattern=task_data.get("recurrence_pattern", "daily"),
+                    recurrence_pattern=intern(task_data.get("recurrence_pattern", "daily")),
                     recurrence_days=task_data.get("recurrence_days", []),
                     next_due_date=datetime.fromisoformat(task_data["next_due_date"]) if task_data.get("next_due_date") else None,
                 )
@@ -500,7 +815,7 @@ class UserDataManager:
             ]
             
             pet = Pet(
-                pet_id=pet_data["pet_id"],
+                pet_id=intern(pet_data["pet_id"]),
                 name=pet_data["name"],
                 species=pet_data["species"],
                 age=pet_data["age"],
@@ -533,31 +848,18 @@ class UserDataManager:
     
     def save_schedule(self, schedule: DailySchedule) -> None:
         """Persist daily schedule to storage."""
-        schedule_data = {
-            "user_id": schedule.user_id,
-            "date": schedule.date.isoformat(),
-            "explanation": schedule.explanation,
-            "scheduled_tasks": [
-                {
-                    "task_id": st.task_id,
-                    "start_time": st.start_time.isoformat(),
-                    "end_time": st.end_time.isoformat(),
-                    "pet_id": st.pet_id,
-                    "status": st.status,
-                    "task_name": st.task.name if st.task else "Unknown",
-                }
-                for st in schedule.scheduled_tasks
-            ],
-        }
+        schedule_data = schedule.to_dict()
         
         schedule_dir = os.path.join(self.storage_path, schedule.user_id, "schedules")
         Path(schedule_dir).mkdir(parents=True, exist_ok=True)
         
+        # One file per day, replaced whole, so re-saving a date doesn't grow storage and
+        # writers from other sessions can't clobber each other's dates.
         date_str = schedule.date.strftime("%Y-%m-%d")
         filepath = os.path.join(schedule_dir, f"{date_str}.json")
-        
-        with open(filepath, 'w') as f:
-            json.dump(schedule_data, f, indent=2)
+        payload = _dump_json_bytes(schedule_data, self.pretty)
+        with self._lock:
+            _write_atomic(filepath, payload)
     
     def load_schedule(self, user_id: str, date: datetime) -> Optional[DailySchedule]:
         """Load schedule for user on specific date."""
@@ -568,17 +870,16 @@ class UserDataManager:
         if not os.path.exists(filepath):
             return None
         
-        with open(filepath, 'r') as f:
-            schedule_data = json.load(f)
+        schedule_data = _load_json_bytes(Path(filepath).read_bytes())
         
         scheduled_tasks = []
         for st_data in schedule_data.get("scheduled_tasks", []):
             st = ScheduledTask(
                 task_id=st_data["task_id"],
-                start_time=datetime.fromisoformat(st_data["start_time"]).time(),
-                end_time=datetime.fromisoformat(st_data["end_time"]).time(),
-                pet_id=st_data["pet_id"],
-                status=st_data["status"],
+                start_time=time.fromisoformat(st_data["start_time"]),
+                end_time=time.fromisoformat(st_data["end_time"]),
+                pet_id=intern(st_data["pet_id"]),
+                status=intern(st_data["status"]),
             )
             scheduled_tasks.append(st)
         
@@ -3,6 +3,12 @@ from datetime import datetime, time, timedelta
 from pawpal_system import User, Pet, Task, ScheduledTask, DailySchedule, TaskScheduler
 
 
+@pytest.fixture(scope="module")
+def empty_scheduler():
+    """Scheduler for a user with no pets; shared by tests that only call its pure helpers."""
+    return TaskScheduler(User(username="john", password="pass", availability=["9-17"], pets=[]))
+
+
 # ==================== SORTING CORRECTNESS TESTS ====================
 
 class TestSortingCorrectness:
@@ -151,6 +157,32 @@ class TestSortingCorrectness:
         assert prioritized[0].preferred_time == "morning"
         assert prioritized[1].preferred_time == "flexible"
         assert prioritized[2].preferred_time == "evening"
+    
+    def test_prioritization_follows_edited_priority_and_time(self):
+        """Changing priority or preferred_time after creation should change the order."""
+        scheduler = TaskScheduler(User(username="john", password="pass", availability=["9-17"]))
+        first = Task(task_id="t1", pet_id="p1", name="First", duration=10, priority=4, category="play")
+        second = Task(task_id="t2", pet_id="p1", name="Second", duration=10, priority=3, category="play")
+        assert scheduler._prioritize_tasks([first, second]) == [first, second]
+        
+        second.update_priority(4)
+        second.preferred_time = "morning"
+        
+        assert scheduler._prioritize_tasks([first, second]) == [second, first]
+    
+    def test_prioritization_medications_ignore_preferred_time(self):
+        """Medications keep input order at equal priority, and flipping is_medication regroups a task."""
+        scheduler = TaskScheduler(User(username="john", password="pass", availability=["9-17"]))
+        evening_med = Task(task_id="t1", pet_id="p1", name="Pill", duration=5, priority=5,
+                           category="medication", is_medication=True, preferred_time="evening")
+        morning_med = Task(task_id="t2", pet_id="p1", name="Drops", duration=5, priority=5,
+                           category="medication", is_medication=True, preferred_time="morning")
+        walk = Task(task_id="t3", pet_id="p1", name="Walk", duration=30, priority=5, category="walk")
+        assert scheduler._prioritize_tasks([walk, evening_med, morning_med]) == [evening_med, morning_med, walk]
+        
+        walk.is_medication = True
+        
+        assert scheduler._prioritize_tasks([walk, evening_med, morning_med]) == [walk, evening_med, morning_med]
 
 
 # ==================== RECURRENCE LOGIC TESTS ====================
@@ -327,6 +359,51 @@ class TestRecurrenceLogic:
         
         # Verify message includes next due date
         assert "Next due" in result
+    
+    def test_weekly_occurrences_match_should_occur_on_date(self):
+        """Expanding a date range should agree with the per-day check."""
+        task = Task(
+            task_id="t1", pet_id="p1", name="Grooming", duration=30,
+            priority=3, category="grooming", is_medication=False,
+            is_recurring=True, recurrence_pattern="weekly", recurrence_days=[0, 3]  # Mon, Thu
+        )
+        start, end = datetime(2026, 2, 15), datetime(2026, 3, 1)
+        
+        occurrences = task.occurrences(start, end)
+        
+        every_day = [start + timedelta(days=i) for i in range((end - start).days + 1)]
+        assert occurrences == [d for d in every_day if task.should_occur_on_date(d)]
+        assert occurrences[0] == datetime(2026, 2, 16)
+    
+    def test_reassigned_recurrence_days_change_occurrence(self):
+        """Replacing recurrence_days should be reflected in should_occur_on_date."""
+        task = Task(
+            task_id="t1", pet_id="p1", name="Grooming", duration=30,
+            priority=3, category="grooming", is_medication=False,
+            is_recurring=True, recurrence_pattern="weekly", recurrence_days=[0]  # Monday
+        )
+        tuesday = datetime(2026, 2, 17)
+        assert not task.should_occur_on_date(tuesday)
+        
+        task.recurrence_days = [1]
+        
+        assert task.should_occur_on_date(tuesday)
+        assert task.calculate_next_due_date(datetime(2026, 2, 16)) == tuesday
+    
+    def test_edited_recurrence_days_change_occurrence(self):
+        """Appending to recurrence_days in place should be reflected too."""
+        task = Task(
+            task_id="t1", pet_id="p1", name="Grooming", duration=30,
+            priority=3, category="grooming", is_medication=False,
+            is_recurring=True, recurrence_pattern="weekly", recurrence_days=[0]  # Monday
+        )
+        tuesday = datetime(2026, 2, 17)
+        
+        task.recurrence_days.append(1)
+        
+        assert task.should_occur_on_date(tuesday)
+        assert task.occurrences(datetime(2026, 2, 16), tuesday) == [datetime(2026, 2, 16), tuesday]
+        assert task.calculate_next_due_date(datetime(2026, 2, 16)) == tuesday
 
 
 # ==================== CONFLICT DETECTION TESTS ====================
@@ -334,10 +411,8 @@ class TestRecurrenceLogic:
 class TestConflictDetection:
     """Verify that the scheduler flags overlapping times."""
     
-    def test_detect_simple_overlap(self):
+    def test_detect_simple_overlap(self, empty_scheduler):
         """Tasks with overlapping times should be flagged as conflicts."""
-        scheduler = TaskScheduler(User(username="john", password="pass", availability=["9-17"], pets=[]))
-        
         task1 = ScheduledTask(
             task_id="t1", start_time=time(9, 0), end_time=time(9, 30),
             pet_id="p1", status="pending"
@@ -347,15 +422,13 @@ class TestConflictDetection:
             pet_id="p2", status="pending"
         )
         
-        conflicts = scheduler._detect_conflicts([task1, task2])
+        conflicts = empty_scheduler._detect_conflicts([task1, task2])
         
         assert len(conflicts) == 1
         assert conflicts[0] == (task1, task2)
     
-    def test_no_conflict_back_to_back_tasks(self):
+    def test_no_conflict_back_to_back_tasks(self, empty_scheduler):
         """Back-to-back tasks (no overlap) should not conflict."""
-        scheduler = TaskScheduler(User(username="john", password="pass", availability=["9-17"], pets=[]))
-        
         task1 = ScheduledTask(
             task_id="t1", start_time=time(9, 0), end_time=time(9, 15),
             pet_id="p1", status="pending"
@@ -365,14 +438,12 @@ class TestConflictDetection:
             pet_id="p2", status="pending"
         )
         
-        conflicts = scheduler._detect_conflicts([task1, task2])
+        conflicts = empty_scheduler._detect_conflicts([task1, task2])
         
         assert len(conflicts) == 0
     
-    def test_no_conflict_non_overlapping_tasks(self):
+    def test_no_conflict_non_overlapping_tasks(self, empty_scheduler):
         """Non-overlapping tasks should have no conflicts."""
-        scheduler = TaskScheduler(User(username="john", password="pass", availability=["9-17"], pets=[]))
-        
         task1 = ScheduledTask(
             task_id="t1", start_time=time(9, 0), end_time=time(9, 30),
             pet_id="p1", status="pending"
@@ -382,14 +453,12 @@ class TestConflictDetection:
             pet_id="p2", status="pending"
         )
         
-        conflicts = scheduler._detect_conflicts([task1, task2])
+        conflicts = empty_scheduler._detect_conflicts([task1, task2])
         
         assert len(conflicts) == 0
     
-    def test_detect_multiple_conflicts(self):
+    def test_detect_multiple_conflicts(self, empty_scheduler):
         """Multiple overlapping pairs should all be detected."""
-        scheduler = TaskScheduler(User(username="john", password="pass", availability=["9-17"], pets=[]))
-        
         task1 = ScheduledTask(
             task_id="t1", start_time=time(9, 0), end_time=time(9, 30),
             pet_id="p1", status="pending"
@@ -403,15 +472,13 @@ class TestConflictDetection:
             pet_id="p3", status="pending"
         )
         
-        conflicts = scheduler._detect_conflicts([task1, task2, task3])
+        conflicts = empty_scheduler._detect_conflicts([task1, task2, task3])
         
         # Should have conflicts: (t1,t2), (t1,t3), (t2,t3)
         assert len(conflicts) == 3
     
-    def test_conflict_with_containment(self):
+    def test_conflict_with_containment(self, empty_scheduler):
         """Task completely contained within another should be flagged."""
-        scheduler = TaskScheduler(User(username="john", password="pass", availability=["9-17"], pets=[]))
-        
         task1 = ScheduledTask(
             task_id="t1", start_time=time(9, 0), end_time=time(10, 0),
             pet_id="p1", status="pending"
@@ -421,7 +488,7 @@ class TestConflictDetection:
             pet_id="p2", status="pending"
         )
         
-        conflicts = scheduler._detect_conflicts([task1, task2])
+        conflicts = empty_scheduler._detect_conflicts([task1, task2])
         
         assert len(conflicts) == 1
     
@@ -448,6 +515,40 @@ class TestConflictDetection:
         
         assert schedule.has_conflicts()
     
+    def test_schedule_detect_conflicts_matches_pairwise_scan(self, empty_scheduler):
+        """Sweep-based detection should find the same pairs, in the same order, as a pairwise scan."""
+        tasks = [
+            ScheduledTask(task_id="t1", start_time=time(9, 20), end_time=time(9, 50), pet_id="p1"),
+            ScheduledTask(task_id="t2", start_time=time(9, 0), end_time=time(9, 30), pet_id="p2"),
+            ScheduledTask(task_id="t3", start_time=time(9, 30), end_time=time(9, 40), pet_id="p3"),
+            ScheduledTask(task_id="t4", start_time=time(10, 0), end_time=time(10, 15), pet_id="p4"),
+        ]
+        schedule = DailySchedule(user_id="user1", date=datetime(2026, 2, 15), scheduled_tasks=tasks)
+        
+        conflicts = schedule.detect_conflicts()
+        
+        pairwise = [(a, b) for i, a in enumerate(tasks) for b in tasks[i + 1:] if a.overlaps_with(b)]
+        assert conflicts == pairwise == empty_scheduler._detect_conflicts(tasks)
+        assert [(a.task_id, b.task_id) for a, b in conflicts] == [("t1", "t2"), ("t1", "t3")]
+        assert schedule.has_conflicts()
+    
+    def test_sorted_schedule_conflicts_match_pairwise_scan(self):
+        """Tasks already in start order take the early-exit scan and must agree with a pairwise scan."""
+        tasks = [
+            ScheduledTask(task_id="t1", start_time=time(9, 0), end_time=time(9, 0), pet_id="p1"),
+            ScheduledTask(task_id="t2", start_time=time(9, 0), end_time=time(9, 45), pet_id="p2"),
+            ScheduledTask(task_id="t3", start_time=time(9, 10), end_time=time(9, 20), pet_id="p3"),
+            ScheduledTask(task_id="t4", start_time=time(9, 30), end_time=time(9, 30), pet_id="p4"),
+            ScheduledTask(task_id="t5", start_time=time(9, 45), end_time=time(10, 0), pet_id="p5"),
+        ]
+        schedule = DailySchedule(user_id="user1", date=datetime(2026, 2, 15), scheduled_tasks=tasks)
+        
+        conflicts = schedule.detect_conflicts()
+        
+        pairwise = [(a, b) for i, a in enumerate(tasks) for b in tasks[i + 1:] if a.overlaps_with(b)]
+        assert conflicts == pairwise
+        assert [(a.task_id, b.task_id) for a, b in conflicts] == [("t2", "t3"), ("t2", "t4")]
+    
     def test_conflict_summary_message(self):
         """Conflict summary should describe each conflict clearly."""
         task1 = Task(task_id="t1", pet_id="p1", name="Feed Buddy", duration=10, priority=3, category="feeding")
@@ -476,6 +577,160 @@ class TestConflictDetection:
         assert "Walk Max" in summary
 
 
+# ==================== FILTERING TESTS ====================
+
+class TestScheduleFiltering:
+    """Verify time-range and attribute filters on a DailySchedule."""
+    
+    def test_time_range_includes_only_tasks_fully_inside(self):
+        """Tasks must start and end inside the window to be returned."""
+        inside = ScheduledTask(task_id="t1", start_time=time(9, 0), end_time=time(9, 30), pet_id="p1")
+        spills = ScheduledTask(task_id="t2", start_time=time(11, 45), end_time=time(12, 15), pet_id="p1")
+        before = ScheduledTask(task_id="t3", start_time=time(8, 0), end_time=time(8, 30), pet_id="p1")
+        schedule = DailySchedule(user_id="user1", date=datetime(2026, 2, 15),
+                                 scheduled_tasks=[spills, inside, before])
+        
+        result = schedule.get_tasks_in_time_range(time(9, 0), time(12, 0))
+        
+        assert [t.task_id for t in result] == ["t1"]
+    
+    def test_time_range_sees_rescheduled_task(self):
+        """Rescheduling a task after a query should be reflected in the next query."""
+        task = ScheduledTask(task_id="t1", start_time=time(9, 0), end_time=time(9, 30), pet_id="p1")
+        schedule = DailySchedule(user_id="user1", date=datetime(2026, 2, 15), scheduled_tasks=[task])
+        assert schedule.get_tasks_in_time_range(time(9, 0), time(10, 0)) == [task]
+        
+        task.reschedule(time(14, 0), time(14, 30))
+        
+        assert schedule.get_tasks_in_time_range(time(9, 0), time(10, 0)) == []
+        assert schedule.get_tasks_in_time_range(time(13, 0), time(15, 0)) == [task]
+    
+    def test_sorted_views_follow_status_and_time_changes(self):
+        """Cached time order should refresh after a task is completed or moved."""
+        early = ScheduledTask(task_id="t1", start_time=time(9, 0), end_time=time(9, 30), pet_id="p1")
+        late = ScheduledTask(task_id="t2", start_time=time(10, 0), end_time=time(10, 30), pet_id="p1")
+        schedule = DailySchedule(user_id="user1", date=datetime(2026, 2, 15), scheduled_tasks=[late, early])
+        assert schedule.get_tasks_by_time() == [early, late]
+        
+        early.status = "completed"
+        early.reschedule(time(11, 0), time(11, 30))
+        late.status = "completed"
+        
+        assert schedule.get_tasks_by_time() == [late, early]
+        assert schedule.get_tasks_by_status("completed") == [late]
+        assert schedule.get_tasks_by_pet("p1") == [late, early]
+    
+    def test_completing_task_moves_status_bucket_without_resorting(self):
+        """Status changes should update status lookups but keep the cached time order."""
+        first = ScheduledTask(task_id="t1", start_time=time(9, 0), end_time=time(9, 30), pet_id="p1")
+        second = ScheduledTask(task_id="t2", start_time=time(10, 0), end_time=time(10, 30), pet_id="p1")
+        schedule = DailySchedule(user_id="user1", date=datetime(2026, 2, 15), scheduled_tasks=[second, first])
+        assert schedule.get_tasks_by_status("pending") == [first, second]
+        time_index = schedule._index
+        
+        first.mark_complete(datetime(2026, 2, 15))
+        
+        assert schedule._index is time_index
+        assert schedule.get_tasks_by_status("pending") == [second]
+        assert schedule.get_tasks_by_status("completed") == [first]
+    
+    def test_status_buckets_keep_time_order_across_moves(self):
+        """Tasks moved between status buckets one at a time should land in time order, ties included."""
+        a = ScheduledTask(task_id="a", start_time=time(9, 0), end_time=time(9, 30), pet_id="p1")
+        b = ScheduledTask(task_id="b", start_time=time(9, 0), end_time=time(9, 10), pet_id="p2")
+        c = ScheduledTask(task_id="c", start_time=time(8, 0), end_time=time(8, 30), pet_id="p1")
+        schedule = DailySchedule(user_id="user1", date=datetime(2026, 2, 15), scheduled_tasks=[a, b, c])
+        assert schedule.get_tasks_by_status("pending") == [c, a, b]
+        
+        b.status = "completed"
+        c.status = "completed"
+        a.status = "completed"
+        b.status = "pending"
+        
+        assert schedule.get_tasks_by_status("completed") == [c, a]
+        assert schedule.get_tasks_by_status("pending") == [b]
+    
+    def test_getters_see_replaced_task(self):
+        """Replacing an item in scheduled_tasks should refresh the cached indexes."""
+        a = ScheduledTask(task_id="a", start_time=time(9, 0), end_time=time(9, 30), pet_id="p1")
+        b = ScheduledTask(task_id="b", start_time=time(10, 0), end_time=time(10, 30), pet_id="p1")
+        c = ScheduledTask(task_id="c", start_time=time(8, 0), end_time=time(8, 30), pet_id="p2")
+        schedule = DailySchedule(user_id="user1", date=datetime(2026, 2, 15), scheduled_tasks=[a, b])
+        assert schedule.get_tasks_by_time() == [a, b]
+        
+        schedule.scheduled_tasks[1] = c
+        
+        assert [t.task_id for t in schedule.get_tasks_by_time()] == ["c", "a"]
+        assert schedule.get_tasks_by_pet("p2") == [c]
+        assert schedule.get_tasks_in_time_range(time(9, 30), time(11, 0)) == []
+    
+    def test_getters_see_remove_then_append(self):
+        """A remove followed by an append keeps the length but must still refresh the indexes."""
+        a = ScheduledTask(task_id="a", start_time=time(9, 0), end_time=time(9, 30), pet_id="p1")
+        b = ScheduledTask(task_id="b", start_time=time(10, 0), end_time=time(10, 30), pet_id="p1", status="completed")
+        c = ScheduledTask(task_id="c", start_time=time(8, 0), end_time=time(8, 30), pet_id="p2")
+        schedule = DailySchedule(user_id="user1", date=datetime(2026, 2, 15), scheduled_tasks=[a, b])
+        assert schedule.get_tasks_by_status("completed") == [b]
+        
+        schedule.scheduled_tasks.remove(b)
+        schedule.scheduled_tasks.append(c)
+        
+        assert [t.task_id for t in schedule.get_tasks_by_time()] == ["c", "a"]
+        assert schedule.get_tasks_by_status("completed") == []
+        assert schedule.get_tasks_by_status("pending") == [c, a]
+    
+    def test_task_shared_by_two_schedules_refreshes_both(self):
+        """A task listed in two schedules should be seen with its new time and status by each."""
+        a = ScheduledTask(task_id="a", start_time=time(9, 0), end_time=time(9, 30), pet_id="p1")
+        b = ScheduledTask(task_id="b", start_time=time(10, 0), end_time=time(10, 30), pet_id="p1")
+        first = DailySchedule(user_id="user1", date=datetime(2026, 2, 15), scheduled_tasks=[a, b])
+        second = DailySchedule(user_id="user1", date=datetime(2026, 2, 15), scheduled_tasks=[b, a])
+        for schedule in (first, second):
+            assert schedule.get_tasks_by_time() == [a, b]
+            assert schedule.get_tasks_by_status("pending") == [a, b]
+        
+        a.reschedule(time(11, 0), time(11, 30))
+        b.status = "completed"
+        
+        for schedule in (first, second):
+            assert schedule.get_tasks_by_time() == [b, a]
+            assert schedule.get_tasks_by_status("completed") == [b]
+            assert schedule.get_tasks_in_time_range(time(11, 0), time(12, 0)) == [a]
+    
+    def test_add_task_keeps_start_order(self):
+        """add_task should slot a task in by start time and show up in later queries."""
+        first = ScheduledTask(task_id="t1", start_time=time(9, 0), end_time=time(9, 30), pet_id="p1")
+        last = ScheduledTask(task_id="t3", start_time=time(11, 0), end_time=time(11, 30), pet_id="p1")
+        schedule = DailySchedule(user_id="user1", date=datetime(2026, 2, 15), scheduled_tasks=[first, last])
+        assert schedule.get_tasks_by_time() == [first, last]
+        
+        middle = ScheduledTask(task_id="t2", start_time=time(10, 0), end_time=time(10, 30), pet_id="p2")
+        schedule.add_task(middle)
+        
+        assert schedule.scheduled_tasks == [first, middle, last]
+        assert schedule.get_tasks_by_pet("p2") == [middle]
+    
+    def test_add_task_updates_cached_indexes_in_place(self):
+        """add_task on an ordered, indexed schedule should extend the indexes, matching a rebuild."""
+        first = ScheduledTask(task_id="t1", start_time=time(9, 0), end_time=time(9, 30), pet_id="p1")
+        tie = ScheduledTask(task_id="t2", start_time=time(9, 0), end_time=time(9, 15), pet_id="p2")
+        last = ScheduledTask(task_id="t3", start_time=time(11, 0), end_time=time(11, 30), pet_id="p1")
+        schedule = DailySchedule(user_id="user1", date=datetime(2026, 2, 15), scheduled_tasks=[first, tie, last])
+        assert schedule.get_tasks_by_pet("p1") == [first, last]
+        ordered = schedule._index[1]
+        
+        added = ScheduledTask(task_id="t4", start_time=time(9, 0), end_time=time(10, 0), pet_id="p1")
+        schedule.add_task(added)
+        
+        assert schedule._index[1] is ordered
+        assert schedule.get_tasks_by_time() == [first, tie, added, last]
+        assert schedule.get_tasks_by_pet("p1") == [first, added, last]
+        assert schedule.get_tasks_by_status("pending") == [first, tie, added, last]
+        assert schedule.get_tasks_in_time_range(time(9, 0), time(10, 0)) == [first, tie, added]
+        added.status = "completed"
+        assert schedule.get_tasks_by_status("completed") == [added]
+
+
 # ==================== INTEGRATION TESTS ====================
 
 class TestSchedulerIntegration:
@@ -573,3 +828,34 @@ class TestSchedulerIntegration:
         # Medication should be scheduled despite exceeding availability
         assert len(schedule.scheduled_tasks) == 1
         assert schedule.scheduled_tasks[0].task.is_medication
+    
+    def test_medication_past_midnight_is_left_unscheduled(self):
+        """A medication that would run past midnight can't be placed on the same day."""
+        user = User(username="john", password="pass", availability=["22-23"], pets=[])
+        pet = Pet(pet_id="p1", name="Buddy", species="Dog", age=2, health_info="")
+        pet.tasks = [
+            Task(task_id="med1", pet_id="p1", name="Night Medication", duration=150,
+                 priority=5, category="medication", is_medication=True)
+        ]
+        user.pets = [pet]
+        
+        schedule = TaskScheduler(user).schedule_tasks(datetime(2026, 2, 15))
+        
+        assert schedule.scheduled_tasks == []
+        assert "Unable to Schedule" in schedule.explanation
+    
+    def test_changed_availability_is_reparsed(self):
+        """Parsed availability is cached on the user but must follow edits to availability."""
+        user = User(username="john", password="pass", availability=["9:00-17:00"], pets=[])
+        scheduler = TaskScheduler(user)
+        assert scheduler._parse_availability(datetime(2026, 2, 15)) == (time(9, 0), time(17, 0))
+        
+        user.availability = ["7:30-8:00"]
+        
+        assert scheduler._parse_availability(datetime(2026, 2, 15)) == (time(7, 30), time(8, 0))
+    
+    def test_malformed_availability_falls_back_to_default(self):
+        """Unparseable or out-of-range availability should use 9:00-17:00."""
+        for availability in (["Mon-Fri: 9-5"], ["25-26"], ["9:00-17:75"]):
+            scheduler = TaskScheduler(User(username="john", password="pass", availability=availability))
+            assert scheduler._parse_availability(datetime(2026, 2, 15)) == (time(9, 0), time(17, 0))
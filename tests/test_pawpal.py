@@ -1,6 +1,9 @@
+import os
 import pytest
-from datetime import time
-from pawpal_system import Pet, Task, ScheduledTask
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, time
+import pawpal_system
+from pawpal_system import User, Pet, Task, ScheduledTask, DailySchedule, TaskScheduler, UserDataManager
 
 
 def test_add_task_increases_count():
@@ -19,3 +22,149 @@ def test_mark_complete_sets_status_completed():
     assert st.status == "pending"
     st.mark_complete()
     assert st.status == "completed"
+
+
+def test_mark_complete_accepts_a_plain_date():
+
+    task = Task(task_id="t1", pet_id="p1", name="Walk", duration=30, priority=5, category="walk",
+                is_recurring=True, recurrence_pattern="daily")
+    st = ScheduledTask(task_id="t1", start_time=time(9, 0), end_time=time(9, 30), pet_id="p1", task=task)
+
+    message = st.mark_complete(date(2026, 2, 15))
+
+    assert task.next_due_date == date(2026, 2, 16)
+    assert message.endswith("Next due: Monday, February 16, 2026")
+
+
+def test_save_and_load_user_round_trip(tmp_path):
+    udm = UserDataManager(storage_path=str(tmp_path))
+    user = User(username="sam", password="pw", availability=["9-17"])
+    pet = Pet(pet_id="p1", name="Buddy", species="Dog", age=2, health_info="")
+    pet.add_task(Task(task_id="t1", pet_id="p1", name="Walk", duration=30, priority=5, category="walk",
+                      is_recurring=True, recurrence_pattern="weekly", recurrence_days=[0, 3]))
+    user.pets.append(pet)
+
+    TaskScheduler(user)._parse_availability(datetime(2026, 2, 15))  # populate a cache field; it must not be written out
+    udm.save_user(user)
+    loaded = udm.load_user("sam")
+
+    assert loaded == user
+    assert '"_' not in (tmp_path / "sam.json").read_text()
+
+
+def test_schedules_save_and_load_by_date(tmp_path):
+    udm = UserDataManager(storage_path=str(tmp_path))
+    day1, day2 = datetime(2026, 2, 15), datetime(2026, 2, 16)
+    walk = ScheduledTask(task_id="t1", start_time=time(9, 0), end_time=time(9, 30), pet_id="p1")
+    udm.save_schedule(DailySchedule(user_id="sam", date=day1, scheduled_tasks=[walk]))
+    udm.save_schedule(DailySchedule(user_id="sam", date=day2, explanation="first"))
+    udm.save_schedule(DailySchedule(user_id="sam", date=day2, explanation="second"))
+
+    fresh = UserDataManager(storage_path=str(tmp_path))
+    loaded = fresh.load_schedule("sam", day1)
+
+    assert [(t.task_id, t.start_time, t.end_time) for t in loaded.scheduled_tasks] == [("t1", time(9, 0), time(9, 30))]
+    assert fresh.load_schedule("sam", day2).explanation == "second"
+    assert fresh.load_schedule("sam", datetime(2026, 2, 17)) is None
+
+
+def test_interleaved_managers_keep_each_others_schedules(tmp_path):
+    a, b = UserDataManager(storage_path=str(tmp_path)), UserDataManager(storage_path=str(tmp_path))
+    a.save_schedule(DailySchedule(user_id="sam", date=datetime(2026, 2, 1), explanation="a1"))
+    b.save_schedule(DailySchedule(user_id="sam", date=datetime(2026, 2, 2), explanation="b2"))
+    a.save_schedule(DailySchedule(user_id="sam", date=datetime(2026, 2, 3), explanation="a3"))
+
+    fresh = UserDataManager(storage_path=str(tmp_path))
+
+    assert [fresh.load_schedule("sam", datetime(2026, 2, d)).explanation for d in (1, 2, 3)] == ["a1", "b2", "a3"]
+
+
+@pytest.mark.skipif(not hasattr(os, "fchmod"), reason="file modes are POSIX-only")
+def test_saves_keep_existing_file_mode(tmp_path):
+    udm = UserDataManager(storage_path=str(tmp_path))
+    path = tmp_path / "sam.json"
+    umask = os.umask(0)
+    os.umask(umask)
+
+    udm.save_user(User(username="sam", password="pw"))
+    assert path.stat().st_mode & 0o777 == 0o666 & ~umask
+
+    path.chmod(0o640)
+    udm.save_user(User(username="sam", password="pw2"))
+    assert path.stat().st_mode & 0o777 == 0o640
+    assert [p.name for p in tmp_path.iterdir()] == ["sam.json"]
+
+
+def test_tasks_flat_sees_added_and_removed_tasks():
+    user = User(username="sam", password="pw")
+    pet = Pet(pet_id="p1", name="Buddy", species="Dog", age=2, health_info="")
+    user.pets.append(pet)
+    assert user.tasks_flat() == []
+
+    walk = Task(task_id="t1", pet_id="p1", name="Walk", duration=30, priority=5, category="walk")
+    pet.add_task(walk)
+    assert user.tasks_flat() == [walk]
+
+    pet.tasks = [t for t in pet.tasks if t.task_id != "t1"]
+    assert user.tasks_flat() == []
+
+    pet.add_task(walk)
+    feed = Task(task_id="t2", pet_id="p1", name="Feed", duration=10, priority=4, category="feeding")
+    pet.tasks[0] = feed
+    assert user.tasks_flat() == [feed]
+
+
+def test_stdlib_fallback_writes_same_user_json(tmp_path, monkeypatch):
+    user = User(username="sam", password="pw", availability=["9-17"])
+    pet = Pet(pet_id="p1", name="Buddy", species="Dog", age=2, health_info="")
+    pet.add_task(Task(task_id="t1", pet_id="p1", name="Walk", duration=30, priority=5, category="walk",
+                      next_due_date=datetime(2026, 2, 16, 8, 30)))
+    user.pets.append(pet)
+    UserDataManager(storage_path=str(tmp_path / "fast")).save_user(user)
+
+    monkeypatch.setattr(pawpal_system, "orjson", None)
+    UserDataManager(storage_path=str(tmp_path / "stdlib")).save_user(user)
+
+    assert (tmp_path / "fast" / "sam.json").read_bytes() == (tmp_path / "stdlib" / "sam.json").read_bytes()
+
+
+def test_load_all_users_reads_every_saved_user(tmp_path):
+    udm = UserDataManager(storage_path=str(tmp_path))
+    for name in ("sam", "alex", "kim"):
+        udm.save_user(User(username=name, password="pw"))
+    udm.save_schedule(DailySchedule(user_id="sam", date=datetime(2026, 2, 15)))
+
+    users = udm.load_all_users()
+
+    assert sorted(u.username for u in users) == ["alex", "kim", "sam"]
+
+
+def test_concurrent_saves_on_shared_manager(tmp_path):
+
+    udm = UserDataManager(storage_path=str(tmp_path))
+    user = User(username="sam", password="pw")
+    schedule = DailySchedule(user_id="sam", date=datetime(2026, 2, 15))
+
+    def save(_):
+        udm.save_user(user)
+        udm.save_schedule(schedule)
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(save, range(200)))
+
+    assert udm.load_user("sam") == user
+    assert list(tmp_path.rglob("*.tmp")) == []
+
+
+def test_separate_managers_write_same_user_concurrently(tmp_path):
+
+    user = User(username="sam", password="pw")
+
+    def save(_):
+        UserDataManager(storage_path=str(tmp_path)).save_user(user)
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(save, range(200)))
+
+    assert UserDataManager(storage_path=str(tmp_path)).load_user("sam") == user
+    assert list(tmp_path.rglob("*.tmp")) == []